@@ -0,0 +1,143 @@
+"""
+Admission control: per route-class concurrency limits with bounded wait queues.
+
+Each request is classified into a lane (`priority`, `write`, `read`, `export`
+or `login`) by what the route does, not its HTTP method: `POST /api/search` is
+a read. A lane admits up to `limit` requests at once, lets up to `max_queue`
+more wait for at most `queue_timeout` seconds, and rejects the rest
+immediately with 503 and `Retry-After`. Keeping the lane limits within the DB
+pool size (`pool_size + max_overflow`, 15 by default) means overload surfaces
+as a fast 503 instead of every route queueing on the pool until it times out.
+
+The priority lane has its own capacity, so patient resource lookups and blood
+availability searches stay responsive while the general lanes shed load.
+Exports get a narrow lane of their own: a slot is held until the whole
+streamed body is sent, which can take minutes, so in the read lane a few
+exports would starve discovery, search and stats. Login also has its own lane:
+it holds a slot for a whole scrypt verification but a DB connection only for
+one short query, so its limit is sized for the password-hashing pool rather
+than the DB pool, and a login burst cannot shed registrations and updates.
+Health, metrics and docs routes are never limited.
+"""
+import asyncio
+import os
+
+import orjson
+
+from metrics import REQUESTS_SHED_TOTAL
+
+EXEMPT_PATHS = {"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json"}
+# Emergency lookups: patient resources, donors by blood type, blood bank stock
+PRIORITY_PREFIXES = (
+    "/api/resources/for-patient",
+    "/api/donors/available",
+    "/api/donors/blood-type/",
+    "/api/inventory/",
+)
+# Long-running streamed responses
+EXPORT_PREFIXES = ("/api/export/",)
+LOGIN_PATHS = {"/api/login"}
+# Read-only routes that take their query as a POST body
+READ_POST_PATHS = {"/api/search"}
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER", "2"))
+
+
+def _env_lane(name: str, limit: int, max_queue: int, queue_timeout: float):
+    prefix = f"ADMISSION_{name.upper()}"
+    return (
+        int(os.getenv(f"{prefix}_LIMIT", str(limit))),
+        int(os.getenv(f"{prefix}_QUEUE", str(max_queue))),
+        float(os.getenv(f"{prefix}_TIMEOUT", str(queue_timeout))),
+    )
+
+
+DEFAULT_LANES = {
+    "priority": _env_lane("priority", 5, 64, 5.0),
+    "write": _env_lane("write", 4, 16, 2.0),
+    "read": _env_lane("read", 5, 32, 2.0),
+    "export": _env_lane("export", 1, 2, 2.0),
+    "login": _env_lane("login", 8, 64, 5.0),
+}
+
+
+def classify(method: str, path: str):
+    """Lane name for a request, or None when it bypasses admission control."""
+    if path in EXEMPT_PATHS:
+        return None
+    if path.startswith(PRIORITY_PREFIXES):
+        return "priority"
+    if path.startswith(EXPORT_PREFIXES):
+        return "export"
+    if path in LOGIN_PATHS:
+        return "login"
+    if path in READ_POST_PATHS:
+        return "read"
+    return "write" if method in WRITE_METHODS else "read"
+
+
+class Lane:
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the bounded queue if needed; False means shed."""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            return True
+        if self.waiting >= self.max_queue:
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+
+    def release(self):
+        self._semaphore.release()
+
+
+async def _send_overloaded(send, lane: str):
+    body = orjson.dumps({"detail": f"Server is busy ({lane} requests); retry shortly"})
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(RETRY_AFTER_SECONDS).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying per-lane limits; sheds with 503 + Retry-After."""
+
+    def __init__(self, app, lanes: dict = None):
+        self.app = app
+        self.lanes = {name: Lane(name, *config) for name, config in (lanes or DEFAULT_LANES).items()}
+
+    async def __call__(self, scope, receive, send):
+        lane_name = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        lane = self.lanes.get(lane_name)
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await lane.acquire():
+            REQUESTS_SHED_TOTAL.inc(lane.name)
+            await _send_overloaded(send, lane.name)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
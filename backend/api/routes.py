@@ -1,12 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from database import SessionLocal
+from database import SessionLocal, ReadSessionLocal
 from schemas import (
     LoginRequest, PatientRegistration, DonorRegistration, HospitalRegistration,
     ProfileUpdate, PatientUpdate, DonorUpdate, HospitalUpdate,
-    SearchRequest, ProfileResponse
+    SearchRequest, ProfileResponse, PatientResponse, DonorResponse, HospitalResponse,
+    DonorListResponse, HospitalListResponse, ProfileListResponse, PatientResourcesResponse,
+    CompleteProfileResponse, StatsResponse, DetailedStatsResponse,
+    InventorySearchResponse, DonorEntry, HospitalEntry, TokenResponse,
+    DonorBulkUpdate, DonorBulkResponse
 )
 import crud
+import passwords
+import tokens
+from inventory_snapshot import inventory_snapshot
+from singleflight import SingleFlight
+import csv
+import io
+import orjson
+import os
+import time
 import uuid
 from typing import Optional
 
@@ -20,18 +36,152 @@ def get_db():
     finally:
         db.close()
 
+# After a write, the client's reads stay on the primary for this long so it
+# sees its own change despite replica lag. The deadline is returned both as a
+# cookie and as a response header; clients send back either one (browsers on
+# another origin need `credentials: "include"` for the cookie).
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+READ_YOUR_WRITES_HEADER = "X-Read-Primary-Until"
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+
+def _recent_write(request: Request) -> bool:
+    deadline = request.headers.get(READ_YOUR_WRITES_HEADER) or request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)
+    try:
+        return float(deadline) > time.time()
+    except ValueError:
+        return False
+
+# Dependency for read-only routes that tolerate replica lag (discovery,
+# search, stats): a replica session unless the client wrote recently
+def get_read_db(request: Request):
+    db = ReadSessionLocal(primary=_recent_write(request))
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Dependency for write routes: pins the client's reads to the primary for a while
+def read_your_writes(response: Response):
+    deadline = str(int(time.time()) + READ_YOUR_WRITES_SECONDS)
+    response.set_cookie(
+        READ_YOUR_WRITES_COOKIE,
+        deadline,
+        max_age=READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+        samesite="lax"
+    )
+    response.headers[READ_YOUR_WRITES_HEADER] = deadline
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# Dependency: claims of the bearer token issued by /api/login (no DB access)
+def get_current_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> tokens.TokenClaims:
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    try:
+        return tokens.verify_token(credentials.credentials)
+    except tokens.InvalidToken as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+def _check_self_or_role(claims: tokens.TokenClaims, user_id: str, allowed_types: tuple):
+    if claims.user_id != user_id.lower() and claims.user_type not in allowed_types:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed to read another user's data"
+        )
+
+# Dependency factory for private reads: the caller must own `user_id` or have
+# one of `allowed_types`. Checked from the token alone, so reads stay DB-free.
+def require_self_or_role(*allowed_types: str):
+    def dependency(user_id: str, claims: tokens.TokenClaims = Depends(get_current_user)) -> tokens.TokenClaims:
+        _check_self_or_role(claims, user_id, allowed_types)
+        return claims
+    return dependency
+
+def _ensure_not_revoked(db: Session, claims: tokens.TokenClaims):
+    if crud.is_token_revoked(db, claims.token_id):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+# Dependency for sensitive writes: the caller must own `user_id`, and the
+# token must not have been revoked (the only check that touches the DB)
+def require_self_write(
+    user_id: str,
+    claims: tokens.TokenClaims = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> tokens.TokenClaims:
+    if claims.user_id != user_id.lower():
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed to modify another user's data"
+        )
+    _ensure_not_revoked(db, claims)
+    return claims
+
+# Dependency for bulk writes: hospital accounts only, token not revoked
+def require_hospital_write(
+    claims: tokens.TokenClaims = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> tokens.TokenClaims:
+    if claims.user_type != "hospital":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only hospital accounts can make bulk updates"
+        )
+    _ensure_not_revoked(db, claims)
+    return claims
+
+# Dependency for bulk PII exports: hospital accounts only, token not revoked
+def require_export_access(
+    claims: tokens.TokenClaims = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> tokens.TokenClaims:
+    if claims.user_type != "hospital":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only hospital accounts can export profiles"
+        )
+    _ensure_not_revoked(db, claims)
+    return claims
+
 # ==================== Authentication Endpoints ====================
 
-@router.post("/login")
-def login(request: LoginRequest, db: Session = Depends(get_db)):
+def _login_credentials(email: str):
+    db = SessionLocal()
+    try:
+        return crud.get_login_credentials(db, email)
+    finally:
+        db.close()
+
+def _store_password_hash(user_id, password_hash: str):
+    db = SessionLocal()
+    try:
+        crud.update_password_hash(db, user_id, password_hash)
+    finally:
+        db.close()
+
+@router.post("/login", response_model=TokenResponse)
+async def login(request: LoginRequest):
     """
-    Authenticate a user and return user information.
+    Authenticate a user and return a session token.
     
-    This endpoint validates user credentials and returns user ID, email, and user type.
-    Works for all user types: patients, donors, and hospitals.
+    This endpoint validates user credentials and returns user ID, email, user type and a
+    signed, short-lived bearer token. Send the token as `Authorization: Bearer <token>`
+    to the user-specific endpoints. Works for all user types: patients, donors, and hospitals.
     
     **Input Parameters:**
-    - `email` (str, required): User's email address. Must be a valid email format.
+    - `email` (str, required): User's email address. Matched case-insensitively.
     - `password` (str, required): User's password. Will be hashed and verified.
     
     **Request Body Example:**
@@ -44,6 +194,9 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
     
     **Response:**
     - `message` (str): Success message
+    - `access_token` (str): Signed session token (JWT, HS256)
+    - `token_type` (str): Always "bearer"
+    - `expires_in` (int): Seconds until the token expires (`SESSION_TOKEN_TTL`, default 900)
     - `user_id` (str): UUID of the authenticated user
     - `email` (str): User's email address
     - `user_type` (str): Type of user - either "patient", "donor", or "hospital"
@@ -52,6 +205,9 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
     ```json
     {
         "message": "Login successful",
+        "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
+        "token_type": "bearer",
+        "expires_in": 900,
         "user_id": "550e8400-e29b-41d4-a716-446655440000",
         "email": "patient@example.com",
         "user_type": "patient"
@@ -61,26 +217,67 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
     **Error Responses:**
     - 401 Unauthorized: Invalid email or password
     """
-    user = crud.get_user_by_email(db, request.email)
+    # The credentials query runs on the threadpool and returns its connection before
+    # hashing starts; scrypt is then awaited on the process pool, so slow logins hold
+    # neither a request thread nor a DB connection. Unknown emails are checked against
+    # a dummy hash so they take as long as a wrong password.
+    user = await run_in_threadpool(_login_credentials, request.email)
+    matches, needs_rehash = await passwords.verify_password_async(
+        request.password, user.password_hash if user else None
+    )
     
-    if not user or not crud.verify_password(request.password, user.password_hash):
+    if not matches:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
-    profile = crud.get_profile(db, str(user.id))
+    # Upgrade legacy SHA-256 (or outdated-cost) hashes while the password is at hand
+    if needs_rehash:
+        new_hash = await passwords.hash_password_async(request.password)
+        await run_in_threadpool(_store_password_hash, user.id, new_hash)
+    
+    user_type = user.user_type
+    access_token, expires_in = tokens.issue_token(str(user.id), user_type)
     
     return {
         "message": "Login successful",
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": expires_in,
         "user_id": str(user.id),
         "email": user.email,
-        "user_type": profile.user_type if profile else None
+        "user_type": user_type
+    }
+
+@router.post("/logout")
+def logout(claims: tokens.TokenClaims = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Revoke the current session token.
+    
+    The token stays on the revocation list until it would have expired. Revoked tokens
+    are rejected by the profile update endpoints; read endpoints keep accepting them
+    until expiry, since they are verified without a database lookup.
+    
+    **Headers:**
+    - `Authorization: Bearer <access_token>` (required)
+    
+    **Response Example:**
+    ```json
+    {
+        "message": "Logged out"
     }
+    ```
+    
+    **Error Responses:**
+    - 401 Unauthorized: Missing, invalid or expired token
+    """
+    crud.revoke_token(db, claims.token_id, claims.user_id, claims.expires_at)
+    return {"message": "Logged out"}
 
 # ==================== Registration Endpoints ====================
 
-@router.post("/register/patient")
+@router.post("/register/patient", dependencies=[Depends(read_your_writes)])
 def register_patient(patient_data: PatientRegistration, db: Session = Depends(get_db)):
     """
     Register a new patient user with complete profile and medical information.
@@ -167,8 +364,13 @@ def register_patient(patient_data: PatientRegistration, db: Session = Depends(ge
             detail="Email already registered"
         )
     
-    # Create user
+    # Create user (None if a concurrent sign-up took the email since the check)
     user = crud.create_user(db, patient_data.email, patient_data.password)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
     # Create profile
     profile_data = {
@@ -191,7 +393,7 @@ def register_patient(patient_data: PatientRegistration, db: Session = Depends(ge
         "email": user.email
     }
 
-@router.post("/register/donor")
+@router.post("/register/donor", dependencies=[Depends(read_your_writes)])
 def register_donor(donor_data: DonorRegistration, db: Session = Depends(get_db)):
     """
     Register a new donor user with complete profile and donation information.
@@ -276,8 +478,13 @@ def register_donor(donor_data: DonorRegistration, db: Session = Depends(get_db))
             detail="Email already registered"
         )
     
-    # Create user
+    # Create user (None if a concurrent sign-up took the email since the check)
     user = crud.create_user(db, donor_data.email, donor_data.password)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
     # Create profile
     profile_data = {
@@ -300,7 +507,7 @@ def register_donor(donor_data: DonorRegistration, db: Session = Depends(get_db))
         "email": user.email
     }
 
-@router.post("/register/hospital")
+@router.post("/register/hospital", dependencies=[Depends(read_your_writes)])
 def register_hospital(hospital_data: HospitalRegistration, db: Session = Depends(get_db)):
     """
     Register a new hospital user with complete profile and hospital information.
@@ -383,8 +590,13 @@ def register_hospital(hospital_data: HospitalRegistration, db: Session = Depends
             detail="Email already registered"
         )
     
-    # Create user
+    # Create user (None if a concurrent sign-up took the email since the check)
     user = crud.create_user(db, hospital_data.email, hospital_data.password)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
     # Create profile
     profile_data = {
@@ -410,7 +622,7 @@ def register_hospital(hospital_data: HospitalRegistration, db: Session = Depends
 # ==================== Profile Management ====================
 
 @router.get("/profile/{user_id}", response_model=ProfileResponse)
-def get_profile(user_id: str, db: Session = Depends(get_db)):
+def get_profile(user_id: str, db: Session = Depends(get_db), claims: tokens.TokenClaims = Depends(get_current_user)):
     """
     Get a user's profile information.
     
@@ -452,6 +664,7 @@ def get_profile(user_id: str, db: Session = Depends(get_db)):
     ```
     
     **Error Responses:**
+    - 401 Unauthorized: Missing, invalid or expired bearer token
     - 404 Not Found: Profile not found for the given user_id
     """
     profile = crud.get_profile(db, user_id)
@@ -464,8 +677,8 @@ def get_profile(user_id: str, db: Session = Depends(get_db)):
     
     return profile
 
-@router.put("/profile/{user_id}")
-def update_profile(user_id: str, profile_data: ProfileUpdate, db: Session = Depends(get_db)):
+@router.put("/profile/{user_id}", dependencies=[Depends(read_your_writes)])
+def update_profile(user_id: str, profile_data: ProfileUpdate, db: Session = Depends(get_db), claims: tokens.TokenClaims = Depends(require_self_write)):
     """
     Update a user's profile information.
     
@@ -504,6 +717,8 @@ def update_profile(user_id: str, profile_data: ProfileUpdate, db: Session = Depe
     ```
     
     **Error Responses:**
+    - 401 Unauthorized: Missing, invalid or expired bearer token (or revoked via /api/logout)
+    - 403 Forbidden: The token belongs to a different user
     - 404 Not Found: Profile not found for the given user_id
     """
     profile = crud.update_profile(db, user_id, profile_data)
@@ -518,13 +733,14 @@ def update_profile(user_id: str, profile_data: ProfileUpdate, db: Session = Depe
 
 # ==================== Patient-Specific Endpoints ====================
 
-@router.get("/patient/{user_id}")
-def get_patient_data(user_id: str, db: Session = Depends(get_db)):
+@router.get("/patient/{user_id}", response_model=PatientResponse)
+def get_patient_data(user_id: str, db: Session = Depends(get_db), claims: tokens.TokenClaims = Depends(require_self_or_role("hospital"))):
     """
     Get patient-specific medical data.
     
     Retrieves detailed medical information for a patient including:
     blood type, thalassemia type, severity, diagnosis details, and treatment requirements.
+    Only the patient themselves and hospital accounts may read it.
     
     **Path Parameters:**
     - `user_id` (str, required): UUID of the patient. Must be a valid UUID.
@@ -560,6 +776,8 @@ def get_patient_data(user_id: str, db: Session = Depends(get_db)):
     ```
     
     **Error Responses:**
+    - 401 Unauthorized: Missing, invalid or expired bearer token
+    - 403 Forbidden: Caller is neither this patient nor a hospital
     - 404 Not Found: Patient data not found for the given user_id
     """
     patient = crud.get_patient(db, user_id)
@@ -572,8 +790,8 @@ def get_patient_data(user_id: str, db: Session = Depends(get_db)):
     
     return patient
 
-@router.put("/patient/{user_id}")
-def update_patient_data(user_id: str, patient_data: PatientUpdate, db: Session = Depends(get_db)):
+@router.put("/patient/{user_id}", dependencies=[Depends(read_your_writes)])
+def update_patient_data(user_id: str, patient_data: PatientUpdate, db: Session = Depends(get_db), claims: tokens.TokenClaims = Depends(require_self_write)):
     """
     Update patient-specific medical data.
     
@@ -614,6 +832,8 @@ def update_patient_data(user_id: str, patient_data: PatientUpdate, db: Session =
     ```
     
     **Error Responses:**
+    - 401 Unauthorized: Missing, invalid or expired bearer token (or revoked via /api/logout)
+    - 403 Forbidden: The token belongs to a different user
     - 404 Not Found: Patient data not found for the given user_id
     """
     patient = crud.update_patient(db, user_id, patient_data)
@@ -628,8 +848,8 @@ def update_patient_data(user_id: str, patient_data: PatientUpdate, db: Session =
 
 # ==================== Donor-Specific Endpoints ====================
 
-@router.get("/donor/{user_id}")
-def get_donor_data(user_id: str, db: Session = Depends(get_db)):
+@router.get("/donor/{user_id}", response_model=DonorResponse)
+def get_donor_data(user_id: str, db: Session = Depends(get_db), claims: tokens.TokenClaims = Depends(get_current_user)):
     """
     Get donor-specific donation information.
     
@@ -668,6 +888,7 @@ def get_donor_data(user_id: str, db: Session = Depends(get_db)):
     ```
     
     **Error Responses:**
+    - 401 Unauthorized: Missing, invalid or expired bearer token
     - 404 Not Found: Donor data not found for the given user_id
     """
     donor = crud.get_donor(db, user_id)
@@ -680,8 +901,8 @@ def get_donor_data(user_id: str, db: Session = Depends(get_db)):
     
     return donor
 
-@router.put("/donor/{user_id}")
-def update_donor_data(user_id: str, donor_data: DonorUpdate, db: Session = Depends(get_db)):
+@router.put("/donor/{user_id}", dependencies=[Depends(read_your_writes)])
+def update_donor_data(user_id: str, donor_data: DonorUpdate, db: Session = Depends(get_db), claims: tokens.TokenClaims = Depends(require_self_write)):
     """
     Update donor-specific information.
     
@@ -721,6 +942,8 @@ def update_donor_data(user_id: str, donor_data: DonorUpdate, db: Session = Depen
     ```
     
     **Error Responses:**
+    - 401 Unauthorized: Missing, invalid or expired bearer token (or revoked via /api/logout)
+    - 403 Forbidden: The token belongs to a different user
     - 404 Not Found: Donor data not found for the given user_id
     """
     donor = crud.update_donor(db, user_id, donor_data)
@@ -735,8 +958,8 @@ def update_donor_data(user_id: str, donor_data: DonorUpdate, db: Session = Depen
 
 # ==================== Hospital-Specific Endpoints ====================
 
-@router.get("/hospital/{user_id}")
-def get_hospital_data(user_id: str, db: Session = Depends(get_db)):
+@router.get("/hospital/{user_id}", response_model=HospitalResponse)
+def get_hospital_data(user_id: str, db: Session = Depends(get_db), claims: tokens.TokenClaims = Depends(get_current_user)):
     """
     Get hospital-specific information.
     
@@ -773,6 +996,7 @@ def get_hospital_data(user_id: str, db: Session = Depends(get_db)):
     ```
     
     **Error Responses:**
+    - 401 Unauthorized: Missing, invalid or expired bearer token
     - 404 Not Found: Hospital data not found for the given user_id
     """
     hospital = crud.get_hospital(db, user_id)
@@ -785,8 +1009,8 @@ def get_hospital_data(user_id: str, db: Session = Depends(get_db)):
     
     return hospital
 
-@router.put("/hospital/{user_id}")
-def update_hospital_data(user_id: str, hospital_data: HospitalUpdate, db: Session = Depends(get_db)):
+@router.put("/hospital/{user_id}", dependencies=[Depends(read_your_writes)])
+def update_hospital_data(user_id: str, hospital_data: HospitalUpdate, db: Session = Depends(get_db), claims: tokens.TokenClaims = Depends(require_self_write)):
     """
     Update hospital-specific information.
     
@@ -823,6 +1047,8 @@ def update_hospital_data(user_id: str, hospital_data: HospitalUpdate, db: Sessio
     ```
     
     **Error Responses:**
+    - 401 Unauthorized: Missing, invalid or expired bearer token (or revoked via /api/logout)
+    - 403 Forbidden: The token belongs to a different user
     - 404 Not Found: Hospital data not found for the given user_id
     """
     hospital = crud.update_hospital(db, user_id, hospital_data)
@@ -835,16 +1061,156 @@ def update_hospital_data(user_id: str, hospital_data: HospitalUpdate, db: Sessio
     
     return {"message": "Hospital data updated successfully"}
 
+# ==================== Bulk Update Endpoints ====================
+
+# Most donors one filter-based bulk update may change; larger matches are rejected
+BULK_PATCH_MAX_ROWS = int(os.getenv("BULK_PATCH_MAX_ROWS", "5000"))
+
+@router.patch("/bulk/donors", response_model=DonorBulkResponse, dependencies=[Depends(read_your_writes)])
+def bulk_update_donors(
+    request: DonorBulkUpdate,
+    claims: tokens.TokenClaims = Depends(require_hospital_write),
+    db: Session = Depends(get_db)
+):
+    """
+    Update many donors at once, e.g. flipping `available` after a donation drive.
+    
+    Two modes, chosen by the body:
+    - `updates`: a list of `{id, fields}`; each donor gets its own fields. Donors
+      changing the same set of fields are updated by one
+      `UPDATE ... FROM (VALUES ...)` statement.
+    - `filter` + `patch`: the same fields applied to every donor matching the filter,
+      in one `UPDATE` statement.
+    
+    All changes are applied in a single transaction. Requires a hospital account's
+    bearer token.
+    
+    **Request Body Fields:**
+    - `updates` (list, optional): Up to 5000 items of `id` (UUID) and `fields`
+    - `filter` (object, optional): `blood_type` (exact), `city` and `state` (partial
+      match), `available` (bool); at least one of `blood_type`, `city` or `state` is required
+    - `patch` (object, required with `filter`): Fields to set on every matching donor
+    
+    `fields` and `patch` accept only the donation-drive fields `available`,
+    `last_donation_date` and `total_donations`; medical and identity fields stay
+    with the donor's own `PUT /api/donor/{user_id}`. A filter may match at most
+    `BULK_PATCH_MAX_ROWS` donors (default 5000); larger matches change nothing.
+    
+    **Request Body Examples:**
+    ```json
+    {
+        "updates": [
+            {"id": "550e8400-e29b-41d4-a716-446655440000", "fields": {"available": false, "last_donation_date": "2024-03-01"}},
+            {"id": "660e8400-e29b-41d4-a716-446655440001", "fields": {"available": false}}
+        ]
+    }
+    ```
+    ```json
+    {
+        "filter": {"blood_type": "O+", "city": "Mumbai"},
+        "patch": {"available": true}
+    }
+    ```
+    
+    **Response:**
+    - `updated` (int): Number of donors updated
+    - `not_found` (int): Number of ids with no donor record (`updates` mode only)
+    - `results` (list): `{id, status}` per donor, status "updated" or "not_found"
+    
+    **Response Example:**
+    ```json
+    {
+        "updated": 1,
+        "not_found": 1,
+        "results": [
+            {"id": "550e8400-e29b-41d4-a716-446655440000", "status": "updated"},
+            {"id": "660e8400-e29b-41d4-a716-446655440001", "status": "not_found"}
+        ]
+    }
+    ```
+    
+    **Error Responses:**
+    - 400 Bad Request: The same id appears more than once in `updates`, or the filter
+      matches more than `BULK_PATCH_MAX_ROWS` donors
+    - 401 Unauthorized: Missing, invalid, expired or revoked bearer token
+    - 403 Forbidden: The token does not belong to a hospital account
+    - 422 Unprocessable Entity: Neither or both modes given, an empty patch, a filter
+      without a blood type or location, a field outside the donation-drive fields, a null
+      field value, or a negative `total_donations`
+    """
+    if request.filter is not None:
+        try:
+            ids = crud.bulk_patch_donors(
+                db, request.patch.dict(exclude_unset=True), max_rows=BULK_PATCH_MAX_ROWS,
+                **request.filter.dict(exclude_unset=True)
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        results = [{"id": donor_id, "status": "updated"} for donor_id in ids]
+        return {"updated": len(results), "not_found": 0, "results": results}
+
+    donor_ids = [item.id for item in request.updates]
+    if len(set(donor_ids)) != len(donor_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each donor id may appear only once"
+        )
+    found = crud.bulk_update_donors(
+        db, [(item.id, item.fields.dict(exclude_unset=True)) for item in request.updates]
+    )
+    results = [
+        {"id": donor_id, "status": "updated" if donor_id in found else "not_found"}
+        for donor_id in donor_ids
+    ]
+    return {"updated": len(found), "not_found": len(donor_ids) - len(found), "results": results}
+
 # ==================== Cross-Type Discovery Endpoints ====================
 
-@router.get("/donors/available")
+# Identical concurrent discovery queries (e.g. an emergency appeal for O- in
+# one city) share a single DB execution; see singleflight.py. Followers stop
+# waiting for a slow leader after SINGLEFLIGHT_WAIT_TIMEOUT seconds and run the
+# query themselves.
+SINGLEFLIGHT_WAIT_TIMEOUT = float(os.getenv("SINGLEFLIGHT_WAIT_TIMEOUT", "2"))
+discovery_flight = SingleFlight("discovery", wait_timeout=SINGLEFLIGHT_WAIT_TIMEOUT)
+
+def _fold(value: Optional[str]) -> Optional[str]:
+    # City/state filters are case-insensitive, so case never changes the result
+    return value.lower() if value is not None else None
+
+def _coalesced_donors(db: Session, **filters):
+    # Keyed by engine too, so a primary (read-your-writes) read never gets a replica result
+    key = ("donors", id(db.get_bind())) + tuple(
+        (name, _fold(value) if name in ("city", "state") else value)
+        for name, value in sorted(filters.items())
+    )
+    return discovery_flight.do(key, lambda: [
+        DonorEntry(profile=profile, donor_data=donor)
+        for profile, donor in crud.search_donors(db, **filters)
+    ])
+
+def _coalesced_hospitals(db: Session, **filters):
+    key = ("hospitals", id(db.get_bind())) + tuple(
+        (name, _fold(value) if name in ("city", "state") else
+         tuple(sorted(value)) if name == "services" and value else value)
+        for name, value in sorted(filters.items())
+    )
+    return discovery_flight.do(key, lambda: [
+        HospitalEntry(profile=profile, hospital_data=hospital)
+        for profile, hospital in crud.search_hospitals(db, **filters)
+    ])
+
+@router.get("/donors/available", response_model=DonorListResponse)
 def get_available_donors(
     blood_type: Optional[str] = None,
     city: Optional[str] = None,
     state: Optional[str] = None,
+    eligible_only: bool = False,
     limit: int = 50,
     offset: int = 0,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get list of available donors with comprehensive filters.
@@ -856,6 +1222,9 @@ def get_available_donors(
     - `blood_type` (str, optional): Filter by blood type (e.g., "O+", "A-", "B+", "AB+", "O-", "B-", "AB-")
     - `city` (str, optional): Filter by city name. Partial match supported.
     - `state` (str, optional): Filter by state/province name. Partial match supported.
+    - `eligible_only` (bool, optional): Only donors past the inter-donation deferral window
+      (`DONOR_DEFERRAL_DAYS`, default 90 days since `last_donation_date`). Donors who can
+      donate the longest are listed first. (default: False)
     - `limit` (int, optional): Maximum number of results (default: 50, max recommended: 100)
     - `offset` (int, optional): Number of results to skip for pagination (default: 0)
     
@@ -864,6 +1233,7 @@ def get_available_donors(
     GET /api/donors/available?blood_type=O+&city=Mumbai&limit=20
     GET /api/donors/available?city=Delhi&state=Delhi
     GET /api/donors/available?blood_type=AB+&limit=10&offset=0
+    GET /api/donors/available?blood_type=O-&eligible_only=true
     ```
     
     **Response:**
@@ -897,35 +1267,26 @@ def get_available_donors(
     }
     ```
     """
-    profiles = crud.search_profiles(
+    donor_list = _coalesced_donors(
         db,
-        user_type="donor",
         blood_type=blood_type,
         city=city,
         state=state,
         available=True,
+        eligible_only=eligible_only,
         limit=limit,
         offset=offset
     )
     
-    # Enrich with donor-specific data
-    donor_list = []
-    for profile in profiles:
-        donor = crud.get_donor(db, str(profile.id))
-        if donor:
-            donor_list.append({
-                "profile": profile,
-                "donor_data": donor
-            })
-    
     return {"donors": donor_list, "count": len(donor_list)}
 
-@router.get("/donors/nearby")
+@router.get("/donors/nearby", response_model=DonorListResponse)
 def get_nearby_donors(
     city: str,
     blood_type: Optional[str] = None,
+    eligible_only: bool = False,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get nearby available donors by city.
@@ -936,6 +1297,7 @@ def get_nearby_donors(
     **Query Parameters:**
     - `city` (str, required): City name to search in. Partial match supported.
     - `blood_type` (str, optional): Filter by blood type (e.g., "O+", "A-")
+    - `eligible_only` (bool, optional): Only donors who can donate today (default: False)
     - `limit` (int, optional): Maximum number of results (default: 20)
     
     **Request Examples:**
@@ -950,14 +1312,17 @@ def get_nearby_donors(
     **Use Case:** 
     Patient needs urgent blood in their city. Quick search for nearby donors.
     """
-    return get_available_donors(blood_type=blood_type, city=city, limit=limit, db=db)
+    return get_available_donors(
+        blood_type=blood_type, city=city, eligible_only=eligible_only, limit=limit, db=db
+    )
 
-@router.get("/donors/blood-type/{blood_type}")
+@router.get("/donors/blood-type/{blood_type}", response_model=DonorListResponse)
 def get_donors_by_blood_type(
     blood_type: str,
     city: Optional[str] = None,
+    eligible_only: bool = False,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get donors by specific blood type.
@@ -970,6 +1335,7 @@ def get_donors_by_blood_type(
     
     **Query Parameters:**
     - `city` (str, optional): Filter by city name for location-specific results
+    - `eligible_only` (bool, optional): Only donors who can donate today (default: False)
     - `limit` (int, optional): Maximum number of results (default: 50)
     
     **Request Examples:**
@@ -984,15 +1350,17 @@ def get_donors_by_blood_type(
     **Use Case:**
     Patient needs O+ blood specifically. Search all O+ donors.
     """
-    return get_available_donors(blood_type=blood_type, city=city, limit=limit, db=db)
+    return get_available_donors(
+        blood_type=blood_type, city=city, eligible_only=eligible_only, limit=limit, db=db
+    )
 
-@router.get("/hospitals/specialist")
+@router.get("/hospitals/specialist", response_model=HospitalListResponse)
 def get_thalassemia_specialist_hospitals(
     city: Optional[str] = None,
     state: Optional[str] = None,
     limit: int = 50,
     offset: int = 0,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get hospitals with thalassemia specialists.
@@ -1039,9 +1407,8 @@ def get_thalassemia_specialist_hospitals(
     }
     ```
     """
-    profiles = crud.search_profiles(
+    hospital_list = _coalesced_hospitals(
         db,
-        user_type="hospital",
         city=city,
         state=state,
         thalassemia_specialist=True,
@@ -1049,24 +1416,14 @@ def get_thalassemia_specialist_hospitals(
         offset=offset
     )
     
-    # Enrich with hospital-specific data
-    hospital_list = []
-    for profile in profiles:
-        hospital = crud.get_hospital(db, str(profile.id))
-        if hospital and hospital.thalassemia_specialist:
-            hospital_list.append({
-                "profile": profile,
-                "hospital_data": hospital
-            })
-    
     return {"hospitals": hospital_list, "count": len(hospital_list)}
 
-@router.get("/hospitals/nearby")
+@router.get("/hospitals/nearby", response_model=HospitalListResponse)
 def get_nearby_hospitals(
     city: str,
     specialist_only: bool = False,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get nearby hospitals with optional specialist filter.
@@ -1094,30 +1451,20 @@ def get_nearby_hospitals(
     if specialist_only:
         return get_thalassemia_specialist_hospitals(city=city, limit=limit, db=db)
     
-    profiles = crud.search_profiles(
+    hospital_list = _coalesced_hospitals(
         db,
-        user_type="hospital",
         city=city,
         limit=limit
     )
     
-    hospital_list = []
-    for profile in profiles:
-        hospital = crud.get_hospital(db, str(profile.id))
-        if hospital:
-            hospital_list.append({
-                "profile": profile,
-                "hospital_data": hospital
-            })
-    
     return {"hospitals": hospital_list, "count": len(hospital_list)}
 
-@router.get("/hospitals/by-services")
+@router.get("/hospitals/by-services", response_model=HospitalListResponse)
 def get_hospitals_by_services(
     services: str,  # Comma-separated list of services
     city: Optional[str] = None,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get hospitals by their services.
@@ -1147,31 +1494,23 @@ def get_hospitals_by_services(
     """
     service_list = [s.strip() for s in services.split(",")]
     
-    profiles = crud.search_profiles(
+    hospital_list = _coalesced_hospitals(
         db,
-        user_type="hospital",
         city=city,
-        limit=100  # Fetch more to filter
+        services=service_list,
+        limit=limit
     )
     
-    hospital_list = []
-    for profile in profiles:
-        hospital = crud.get_hospital(db, str(profile.id))
-        if hospital and any(service in hospital.services for service in service_list):
-            hospital_list.append({
-                "profile": profile,
-                "hospital_data": hospital
-            })
-    
-    return {"hospitals": hospital_list[:limit], "count": len(hospital_list[:limit])}
+    return {"hospitals": hospital_list, "count": len(hospital_list)}
 
-@router.get("/resources/for-patient")
+@router.get("/resources/for-patient", response_model=PatientResourcesResponse)
 def get_resources_for_patient(
     user_id: str,
     blood_type: Optional[str] = None,
     city: Optional[str] = None,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db),
+    claims: tokens.TokenClaims = Depends(require_self_or_role("hospital"))
 ):
     """
     Get personalized resources for a patient based on their needs.
@@ -1236,24 +1575,28 @@ def get_resources_for_patient(
     - Donors they can contact for blood
     - Hospitals they can visit for treatment
     
+    Only the patient themselves and hospital accounts may call it for a given `user_id`.
+    
     **Error Responses:**
+    - 401 Unauthorized: Missing, invalid or expired bearer token
+    - 403 Forbidden: Caller is neither this patient nor a hospital
     - 404 Not Found: Patient not found
     """
-    patient = crud.get_patient(db, user_id)
-    if not patient:
+    row = crud.get_patient_with_profile(db, user_id)
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Patient not found"
         )
+    patient, patient_profile = row
     
     # Get patient's blood type and location
     required_blood_type = blood_type or patient.blood_type
-    patient_city = city or crud.get_profile(db, user_id).city
+    patient_city = city or patient_profile.city
     
     # Get matching donors
-    matching_donors = crud.search_profiles(
+    matching_donors = _coalesced_donors(
         db,
-        user_type="donor",
         blood_type=required_blood_type,
         city=patient_city,
         available=True,
@@ -1261,37 +1604,22 @@ def get_resources_for_patient(
     )
     
     # Get nearby specialist hospitals
-    specialist_hospitals = crud.search_profiles(
+    specialist_hospitals = _coalesced_hospitals(
         db,
-        user_type="hospital",
         city=patient_city,
         thalassemia_specialist=True,
         limit=limit
     )
     
     resources = {
-        "matched_donors": [],
-        "specialist_hospitals": []
+        "matched_donors": matching_donors,
+        "specialist_hospitals": specialist_hospitals
     }
     
-    for profile in matching_donors:
-        donor = crud.get_donor(db, str(profile.id))
-        resources["matched_donors"].append({
-            "profile": profile,
-            "donor_data": donor
-        })
-    
-    for profile in specialist_hospitals:
-        hospital = crud.get_hospital(db, str(profile.id))
-        resources["specialist_hospitals"].append({
-            "profile": profile,
-            "hospital_data": hospital
-        })
-    
     return resources
 
-@router.get("/complete-profile/{user_id}")
-def get_complete_profile(user_id: str, db: Session = Depends(get_db)):
+@router.get("/complete-profile/{user_id}", response_model=CompleteProfileResponse, response_model_exclude_unset=True)
+def get_complete_profile(user_id: str, db: Session = Depends(get_db), claims: tokens.TokenClaims = Depends(get_current_user)):
     """
     Get complete profile including all related data based on user type.
     
@@ -1345,8 +1673,12 @@ def get_complete_profile(user_id: str, db: Session = Depends(get_db)):
     
     **Use Case:**
     Get all information about a user for profile display, contact purposes, or detailed views.
+    A patient's complete profile carries medical data, so only the patient themselves and
+    hospital accounts may read it; donor and hospital profiles are open to any signed-in user.
     
     **Error Responses:**
+    - 401 Unauthorized: Missing, invalid or expired bearer token
+    - 403 Forbidden: Profile is a patient's and the caller is neither that patient nor a hospital
     - 404 Not Found: Profile not found
     """
     profile = crud.get_profile(db, user_id)
@@ -1356,6 +1688,9 @@ def get_complete_profile(user_id: str, db: Session = Depends(get_db)):
             detail="Profile not found"
         )
     
+    if profile.user_type == "patient":
+        _check_self_or_role(claims, user_id, ("hospital",))
+    
     result = {"profile": profile}
     
     if profile.user_type == "patient":
@@ -1369,14 +1704,33 @@ def get_complete_profile(user_id: str, db: Session = Depends(get_db)):
 
 # ==================== Search Endpoints ====================
 
-@router.post("/search")
-def search_profiles(request: SearchRequest, db: Session = Depends(get_db)):
+# User types a caller may not list: patients are visible to hospitals only
+def _hidden_user_types(claims: tokens.TokenClaims, user_type: Optional[str]) -> tuple:
+    if claims.user_type == "hospital":
+        return ()
+    if user_type == "patient":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only hospital accounts can list patients"
+        )
+    return ("patient",)
+
+@router.post("/search", response_model=ProfileListResponse)
+def search_profiles(
+    request: SearchRequest,
+    db: Session = Depends(get_read_db),
+    claims: tokens.TokenClaims = Depends(get_current_user)
+):
     """
     Search for profiles based on various criteria.
     
     Advanced search endpoint with multiple filters. Can search across all user types
     or filter to specific types. Supports location, blood type, availability, and specialist filters.
     
+    Requires a bearer token. Patient profiles are only returned to hospital accounts;
+    for other callers they are left out of the results. Profiles are listed without
+    phone or address.
+    
     **Request Body Fields:**
     - `user_type` (str, optional): Filter by "patient", "donor", or "hospital"
     - `blood_type` (str, optional): Filter by blood type (for patients and donors)
@@ -1384,6 +1738,7 @@ def search_profiles(request: SearchRequest, db: Session = Depends(get_db)):
     - `state` (str, optional): Filter by state/province name (partial match)
     - `thalassemia_specialist` (bool, optional): Filter hospitals by specialist status
     - `available` (bool, optional): Filter donors by availability
+    - `eligible_only` (bool, optional): Only donors past the inter-donation deferral window
     - `limit` (int, optional): Maximum results (default: 50)
     - `offset` (int, optional): Pagination offset (default: 0)
     
@@ -1418,7 +1773,12 @@ def search_profiles(request: SearchRequest, db: Session = Depends(get_db)):
         "count": 1
     }
     ```
+    
+    **Error Responses:**
+    - 401 Unauthorized: Missing, invalid or expired bearer token
+    - 403 Forbidden: `user_type` is "patient" and the caller is not a hospital
     """
+    exclude_user_types = _hidden_user_types(claims, request.user_type)
     profiles = crud.search_profiles(
         db,
         user_type=request.user_type,
@@ -1427,14 +1787,22 @@ def search_profiles(request: SearchRequest, db: Session = Depends(get_db)):
         state=request.state,
         thalassemia_specialist=request.thalassemia_specialist,
         available=request.available,
+        eligible_only=request.eligible_only,
         limit=request.limit,
-        offset=request.offset
+        offset=request.offset,
+        exclude_user_types=exclude_user_types
     )
     
     return {"profiles": profiles, "count": len(profiles)}
 
-@router.get("/profiles")
-def get_all_profiles(user_type: str = None, limit: int = 50, offset: int = 0, db: Session = Depends(get_db)):
+@router.get("/profiles", response_model=ProfileListResponse)
+def get_all_profiles(
+    user_type: str = None,
+    limit: int = 50,
+    offset: int = 0,
+    db: Session = Depends(get_read_db),
+    claims: tokens.TokenClaims = Depends(get_current_user)
+):
     """
     Get all profiles with optional filtering by user type.
     
@@ -1458,20 +1826,240 @@ def get_all_profiles(user_type: str = None, limit: int = 50, offset: int = 0, db
     
     **Use Case:**
     Browse all users, with pagination support.
+    
+    Requires a bearer token. Patient profiles are only listed for hospital accounts,
+    and profiles are listed without phone or address.
+    
+    **Error Responses:**
+    - 401 Unauthorized: Missing, invalid or expired bearer token
+    - 403 Forbidden: `user_type` is "patient" and the caller is not a hospital
     """
     profiles = crud.search_profiles(
         db,
         user_type=user_type,
         limit=limit,
-        offset=offset
+        offset=offset,
+        exclude_user_types=_hidden_user_types(claims, user_type)
     )
     
     return {"profiles": profiles, "count": len(profiles)}
 
+# ==================== Export Endpoints ====================
+
+EXPORT_ROLE_RESPONSES = {
+    "patient": PatientResponse,
+    "donor": DonorResponse,
+    "hospital": HospitalResponse,
+}
+
+def _export_rows(user_type: str, batch_size: int, primary: bool):
+    """Yield flat dicts of profile + role fields, using a session owned by the stream."""
+    role_response = EXPORT_ROLE_RESPONSES[user_type]
+    db = ReadSessionLocal(primary=primary)
+    try:
+        for profile, role in crud.iter_profiles_with_role(db, user_type, batch_size=batch_size):
+            row = ProfileResponse.model_validate(profile).model_dump(mode="json")
+            row.update(role_response.model_validate(role).model_dump(mode="json"))
+            yield row
+    finally:
+        db.close()
+
+def _export_ndjson(user_type: str, batch_size: int, primary: bool):
+    chunk = []
+    for row in _export_rows(user_type, batch_size, primary):
+        chunk.append(orjson.dumps(row))
+        if len(chunk) >= batch_size:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+def _export_csv(user_type: str, batch_size: int, primary: bool):
+    columns = list(ProfileResponse.model_fields)
+    columns += [f for f in EXPORT_ROLE_RESPONSES[user_type].model_fields if f != "id"]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    rows_in_buffer = 0
+    for row in _export_rows(user_type, batch_size, primary):
+        # Array columns (services, health_conditions, ...) are pipe-joined
+        writer.writerow({
+            key: "|".join(value) if isinstance(value, list) else value
+            for key, value in row.items()
+        })
+        rows_in_buffer += 1
+        if rows_in_buffer >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            rows_in_buffer = 0
+    yield buffer.getvalue()
+
+@router.get("/export/{user_type}")
+def export_profiles(
+    request: Request,
+    user_type: str,
+    format: str = "ndjson",
+    batch_size: int = 1000,
+    claims: tokens.TokenClaims = Depends(require_export_access)
+):
+    """
+    Stream every active profile of a user type together with its role data.
+    
+    Rows are read from a server-side cursor and written out as they arrive, so
+    exporting the full registry uses constant memory on the API server. Prefer this
+    over paging through `/api/profiles` for analytics pulls.
+    
+    The export contains contact details and medical fields, so it requires a bearer
+    token from a hospital account that has not been revoked.
+    
+    **Path Parameters:**
+    - `user_type` (str, required): "patient", "donor", or "hospital"
+    
+    **Query Parameters:**
+    - `format` (str, optional): "ndjson" (one JSON object per line) or "csv" (default: "ndjson")
+    - `batch_size` (int, optional): Rows fetched per cursor round trip (default: 1000)
+    
+    **Request Examples:**
+    ```bash
+    GET /api/export/donor
+    GET /api/export/hospital?format=csv
+    ```
+    
+    **Response:**
+    A streamed body. Each row has the profile fields followed by the type-specific fields
+    (e.g. `blood_type`, `available` for donors). In CSV, array fields are joined with `|`.
+    
+    **Error Responses:**
+    - 400 Bad Request: Unknown user type, format or batch size
+    - 401 Unauthorized: Missing, invalid, expired or revoked bearer token
+    - 403 Forbidden: Caller is not a hospital account
+    """
+    if user_type not in EXPORT_ROLE_RESPONSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="user_type must be one of: patient, donor, hospital"
+        )
+    if batch_size < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="batch_size must be positive"
+        )
+    # Read from the primary right after the caller's own writes (e.g. a bulk update)
+    primary = _recent_write(request)
+    
+    if format == "ndjson":
+        body, media_type = _export_ndjson(user_type, batch_size, primary), "application/x-ndjson"
+    elif format == "csv":
+        body, media_type = _export_csv(user_type, batch_size, primary), "text/csv"
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="format must be one of: ndjson, csv"
+        )
+    
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{user_type}s.{format}"'}
+    )
+
+# ==================== Inventory Endpoints ====================
+
+@router.get("/inventory/search", response_model=InventorySearchResponse)
+def search_inventory(
+    blood_group: str,
+    lat: float,
+    lon: float,
+    radius_km: float = 25.0,
+    min_units: int = 1,
+    emergency_only: bool = False,
+    limit: int = 20,
+    db: Session = Depends(get_db)
+):
+    """
+    Find blood banks stocking a blood group near a location, nearest first.
+    
+    Searches the blood bank inventory loaded by `load_inventory.py`. Results come
+    from an in-memory snapshot refreshed from the database every few seconds
+    (`INVENTORY_SNAPSHOT_TTL`), so stock levels may lag writes by that much.
+    
+    **Query Parameters:**
+    - `blood_group` (str, required): One of A+, A-, B+, B-, AB+, AB-, O+, O-
+    - `lat` (float, required): Latitude of the search location
+    - `lon` (float, required): Longitude of the search location
+    - `radius_km` (float, optional): Search radius in kilometres (default: 25)
+    - `min_units` (int, optional): Minimum units in stock (default: 1)
+    - `emergency_only` (bool, optional): Only banks with emergency support (default: false)
+    - `limit` (int, optional): Maximum results (default: 20)
+    
+    **Request Examples:**
+    ```bash
+    GET /api/inventory/search?blood_group=O%2B&lat=19.076&lon=72.8777
+    GET /api/inventory/search?blood_group=AB-&lat=28.61&lon=77.21&radius_km=50&min_units=10&emergency_only=true
+    ```
+    
+    **Response:**
+    - `banks` (list): Blood banks with stock details and `distance_km`
+    - `count` (int): Number of banks returned
+    
+    **Response Example:**
+    ```json
+    {
+        "banks": [
+            {
+                "id": "BB0002",
+                "name": "National Visakhapatnam Blood Bank",
+                "city": "Visakhapatnam",
+                "blood_groups": ["A+", "A-", "B+", "AB+", "AB-", "O+", "O-"],
+                "units_available": 25,
+                "emergency_support": true,
+                "distance_km": 3.4
+            }
+        ],
+        "count": 1
+    }
+    ```
+    
+    **Error Responses:**
+    - `400 Bad Request`: Unknown blood group, radius not positive, or coordinates out of range
+    """
+    if blood_group not in crud.BLOOD_TYPE_BITS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid blood_group. Must be one of: {', '.join(crud.BLOOD_TYPES)}"
+        )
+    if radius_km <= 0 or not -90 <= lat <= 90 or not -180 <= lon <= 180:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="radius_km must be positive and lat/lon must be valid coordinates"
+        )
+    
+    rows = inventory_snapshot.search(
+        db,
+        blood_group=blood_group,
+        latitude=lat,
+        longitude=lon,
+        radius_km=radius_km,
+        min_units=min_units,
+        emergency_only=emergency_only,
+        limit=limit
+    )
+    banks = [
+        {
+            **bank,
+            "blood_groups": crud.blood_groups_from_mask(bank["blood_group_mask"]),
+            "distance_km": round(distance, 3)
+        }
+        for bank, distance in rows
+    ]
+    
+    return {"banks": banks, "count": len(banks)}
+
 # ==================== Statistics Endpoints ====================
 
-@router.get("/stats")
-def get_statistics(db: Session = Depends(get_db)):
+@router.get("/stats", response_model=StatsResponse)
+def get_statistics(db: Session = Depends(get_read_db)):
     """
     Get basic statistics for each user type.
     
@@ -1498,11 +2086,11 @@ def get_statistics(db: Session = Depends(get_db)):
     stats = crud.get_stats(db)
     return stats
 
-@router.get("/stats/detailed")
+@router.get("/stats/detailed", response_model=DetailedStatsResponse, response_model_exclude_unset=True)
 def get_detailed_statistics(
     city: Optional[str] = None,
     state: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get detailed statistics with location filtering and resource availability.
@@ -1556,41 +2144,6 @@ def get_detailed_statistics(
     **Use Case:**
     Display detailed analytics for a specific region or overall platform health metrics.
     """
-    # Base stats
-    stats = crud.get_stats(db)
-    
-    # Add location-specific stats if filters provided
-    if city or state:
-        filtered_stats = {}
-        for user_type in ['patient', 'donor', 'hospital']:
-            profiles = crud.search_profiles(
-                db,
-                user_type=user_type,
-                city=city,
-                state=state,
-                limit=1000
-            )
-            filtered_stats[f"{user_type}_count"] = len(profiles)
-        
-        stats['filtered_by_location'] = filtered_stats
-        stats['location_filter'] = {"city": city, "state": state}
-    
-    # Add available donors count
-    available_donors = crud.search_profiles(
-        db,
-        user_type="donor",
-        available=True,
-        limit=1000
-    )
-    stats['available_donors_count'] = len(available_donors)
-    
-    # Add specialist hospitals count
-    specialist_hospitals = crud.search_profiles(
-        db,
-        user_type="hospital",
-        thalassemia_specialist=True,
-        limit=1000
-    )
-    stats['thalassemia_specialist_hospitals_count'] = len(specialist_hospitals)
+    stats = crud.get_detailed_stats(db, city=city, state=state)
     
     return stats
@@ -0,0 +1,72 @@
+"""
+Import-time report for the API's cold start.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter, prints the
+total and the top-level packages that cost the most (summed self time), and
+exits non-zero when the total exceeds --budget-ms. Heavy optional modules
+(lightgbm, sklearn, pandas, joblib, supabase) are reported separately and must
+not appear at all: they belong behind lazy imports.
+
+Run from the backend directory:
+    python -m benchmarks.import_time --budget-ms 1000 --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+LAZY_ONLY = ("lightgbm", "sklearn", "pandas", "joblib", "supabase")
+
+
+def import_times(module: str):
+    """(module, self microseconds, cumulative microseconds) in import order."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+        env={**os.environ, "PYTHONWARNINGS": "ignore"},
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="fail above this total import time")
+    parser.add_argument("--top", type=int, default=15, help="packages to list")
+    args = parser.parse_args()
+
+    rows = import_times(args.module)
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1e3
+    by_package = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+
+    print(f"{'package':<28}{'ms':>10}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<28}{self_us / 1e3:>10.1f}")
+    print(f"{'total (' + args.module + ')':<28}{total_ms:>10.1f}   budget {args.budget_ms:.0f}")
+
+    failed = False
+    eager = sorted({package for package in by_package if package in LAZY_ONLY})
+    if eager:
+        print(f"Imported eagerly but should be lazy: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"Import time {total_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Latency of blood bank radius search over a large blood bank table.
+
+Synthesizes `--banks` blood banks by jittering the coordinates of the rows in
+the synthetic_blood_banks CSV (ids `SYN000001`...), upserts them, then times
+the SQL path (`crud.search_inventory`) and the in-memory snapshot that serves
+/api/inventory/search for the same random queries, and checks they agree.
+
+Run from the backend directory against a scratch database:
+    python -m benchmarks.inventory_search --banks 100000 --queries 2000
+"""
+import argparse
+import csv
+import random
+import time
+
+import crud
+from inventory_snapshot import InventorySnapshot
+from database import SessionLocal
+from load_inventory import DEFAULT_CSV, bank_from_row, load
+
+
+def synthesize(count: int, batch_size: int = 5000, seed_value: int = 42):
+    rng = random.Random(seed_value)
+    with open(DEFAULT_CSV, newline="", encoding="utf-8") as f:
+        templates = [bank_from_row(row) for row in csv.DictReader(f)]
+    db = SessionLocal()
+    try:
+        for start in range(0, count, batch_size):
+            batch = []
+            for n in range(start, min(count, start + batch_size)):
+                bank = dict(rng.choice(templates))
+                bank["id"] = f"SYN{n:06d}"
+                # ~0.5 degree jitter spreads copies around each template city
+                bank["latitude"] += rng.uniform(-0.5, 0.5)
+                bank["longitude"] += rng.uniform(-0.5, 0.5)
+                bank["blood_group_mask"] = rng.randrange(1, 256)
+                bank["units_available"] = rng.randint(0, 60)
+                batch.append(bank)
+            crud.upsert_blood_banks(db, batch)
+    finally:
+        db.close()
+    return templates
+
+
+def make_queries(templates, count: int, seed_value: int = 7):
+    rng = random.Random(seed_value)
+    return [
+        (rng.choice(crud.BLOOD_TYPES), origin["latitude"], origin["longitude"])
+        for origin in (rng.choice(templates) for _ in range(count))
+    ]
+
+
+def run(search, queries, radius_km: float):
+    """Returns (sorted latencies, result ids per query)."""
+    db = SessionLocal()
+    latencies, results = [], []
+    try:
+        for blood_group, latitude, longitude in queries:
+            start = time.perf_counter()
+            rows = search(db, blood_group, latitude, longitude, radius_km=radius_km, min_units=5)
+            latencies.append(time.perf_counter() - start)
+            results.append([bank["id"] if isinstance(bank, dict) else bank.id for bank, _ in rows])
+    finally:
+        db.close()
+    latencies.sort()
+    return latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--banks", type=int, default=100_000, help="synthetic banks to add (0 to reuse existing rows)")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--radius-km", type=float, default=25.0)
+    args = parser.parse_args()
+
+    load(DEFAULT_CSV)
+    if args.banks:
+        templates = synthesize(args.banks)
+    else:
+        with open(DEFAULT_CSV, newline="", encoding="utf-8") as f:
+            templates = [bank_from_row(row) for row in csv.DictReader(f)]
+
+    queries = make_queries(templates, args.queries)
+    snapshot = InventorySnapshot(ttl_seconds=float("inf"))
+    db = SessionLocal()
+    start = time.perf_counter()
+    snapshot.refresh(db, full=True)
+    print(f"snapshot load: {time.perf_counter() - start:.2f} s for {len(snapshot._columns.records)} banks")
+    db.close()
+
+    print(f"{args.queries} searches, radius {args.radius_km} km")
+    outcomes = {}
+    for name, search in (("sql", crud.search_inventory), ("snapshot", snapshot.search)):
+        latencies, outcomes[name] = run(search, queries, args.radius_km)
+        pct = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1e3
+        print(f"{name:<10}p50 {pct(50):.3f} ms  p95 {pct(95):.3f} ms  p99 {pct(99):.3f} ms")
+    mismatches = sum(a != b for a, b in zip(outcomes["sql"], outcomes["snapshot"]))
+    print(f"result mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
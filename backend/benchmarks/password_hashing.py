@@ -0,0 +1,70 @@
+"""
+Login password-check throughput: scrypt inline on request threads vs the process pool.
+
+Verifies a scrypt hash from `--concurrency` threads (standing in for the
+threadpool that runs the sync /api/login handler), first inline and then
+through the passwords.py process pool. For each mode it prints verifications
+per second and the p95 delay of a trivial task scheduled on another thread
+meanwhile, which shows how much hashing starves the rest of the process.
+Cost parameters come from PASSWORD_SCRYPT_N/_R/_P as in the server.
+
+Run from the backend directory:
+    python -m benchmarks.password_hashing --logins 200 --concurrency 16
+    PASSWORD_HASH_WORKERS=8 python -m benchmarks.password_hashing
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import passwords
+
+PASSWORD = "BenchmarkPassword123"
+
+
+def probe(stop: threading.Event, delays: list):
+    """Delay between asking for a 1 ms sleep and getting control back."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        time.sleep(0.001)
+        delays.append(time.perf_counter() - start - 0.001)
+
+
+def run(stored_hash: str, logins: int, concurrency: int):
+    stop, delays = threading.Event(), []
+    prober = threading.Thread(target=probe, args=(stop, delays))
+    prober.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda _: passwords.verify_password(PASSWORD, stored_hash)[0], range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    prober.join()
+    if not all(results):
+        raise SystemExit("Password verification failed")
+    delays.sort()
+    return logins / elapsed, delays[int(len(delays) * 0.95)] * 1e3 if delays else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200, help="password checks per mode")
+    parser.add_argument("--concurrency", type=int, default=16, help="request threads")
+    args = parser.parse_args()
+
+    workers = passwords.HASH_WORKERS or 1
+    stored_hash = passwords.hash_password(PASSWORD)
+    print(f"scrypt n={passwords.SCRYPT_N} r={passwords.SCRYPT_R} p={passwords.SCRYPT_P}, {workers} pool workers")
+    print(f"{'mode':<10}{'logins/s':>10}{'probe p95':>14}")
+    try:
+        for mode, hash_workers in (("inline", 0), ("pool", workers)):
+            passwords.HASH_WORKERS = hash_workers
+            run(stored_hash, min(args.concurrency, args.logins), args.concurrency)  # warm-up / spawn workers
+            rate, probe_p95 = run(stored_hash, args.logins, args.concurrency)
+            print(f"{mode:<10}{rate:>10.1f}{probe_p95:>11.2f} ms")
+    finally:
+        passwords.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Query-count budgets for every route in api/routes.py.
+
+Each route is called once against a seeded database inside
+`query_guard.assert_max_queries`; the process exits non-zero if any route
+issues more statements than its budget. Budgets are ceilings on round trips,
+not on rows, so they must hold at any data size.
+
+User-specific routes are called with a bearer token for the seeded user they
+target, issued directly by `tokens.issue_token` so login is not counted.
+
+Run from the backend directory against a scratch database:
+    python -m benchmarks.query_budgets --seed 50
+
+CI runs exactly this on every push and pull request
+(.github/workflows/query-budgets.yml), so a regression fails the build.
+"""
+import argparse
+import sys
+import uuid
+
+from fastapi.testclient import TestClient
+
+from benchmarks.seed import SEED_PASSWORD, seed, seed_email
+from database import SessionLocal
+from main import app
+from models import User
+from query_guard import QueryBudgetExceeded, assert_max_queries
+import tokens
+
+
+def _registration(user_type: str, **extra):
+    body = {
+        "email": f"budget-{uuid.uuid4().hex[:12]}@example.com",
+        "password": "BudgetPassword123",
+        "first_name": "Budget",
+        "last_name": "Check",
+        "city": "Mumbai",
+        "state": "Maharashtra",
+    }
+    body.update(extra)
+    return body
+
+
+def route_budgets(ids):
+    """(method, url, json body, max statements) for each route.
+
+    The PUT and PATCH budgets include the token revocation check.
+    """
+    patient, donor, hospital = ids["patient"], ids["donor"], ids["hospital"]
+    return [
+        ("POST", "/api/login", {"email": seed_email("patient", 0), "password": SEED_PASSWORD}, 1),
+        ("POST", "/api/register/patient", _registration("patient", blood_type="O+"), 9),
+        ("POST", "/api/register/donor", _registration("donor", blood_type="O+"), 9),
+        ("POST", "/api/register/hospital", _registration("hospital", hospital_name="Budget Hospital"), 9),
+        ("GET", f"/api/profile/{patient}", None, 1),
+        ("PUT", f"/api/profile/{patient}", {"city": "Mumbai"}, 2),
+        ("GET", f"/api/patient/{patient}", None, 1),
+        ("PUT", f"/api/patient/{patient}", {"severity_level": "major"}, 2),
+        ("GET", f"/api/donor/{donor}", None, 1),
+        ("PUT", f"/api/donor/{donor}", {"available": True}, 2),
+        ("GET", f"/api/hospital/{hospital}", None, 1),
+        ("PUT", f"/api/hospital/{hospital}", {"website": "https://example.com"}, 2),
+        ("PATCH", "/api/bulk/donors", {"updates": [
+            {"id": donor, "fields": {"available": True}},
+            {"id": str(uuid.uuid4()), "fields": {"available": True}},
+        ]}, 2),
+        ("PATCH", "/api/bulk/donors", {"filter": {"blood_type": "O+", "city": "Mumbai"}, "patch": {"available": True}}, 3),
+        ("GET", "/api/donors/available?blood_type=O%2B&limit=100", None, 1),
+        ("GET", "/api/donors/available?blood_type=O%2B&eligible_only=true", None, 1),
+        ("GET", "/api/donors/nearby?city=Mumbai", None, 1),
+        ("GET", "/api/donors/blood-type/O%2B?city=Mumbai", None, 1),
+        ("GET", "/api/hospitals/specialist?limit=100", None, 1),
+        ("GET", "/api/hospitals/nearby?city=Mumbai", None, 1),
+        ("GET", "/api/hospitals/by-services?services=Blood%20Bank,Emergency", None, 1),
+        ("GET", f"/api/resources/for-patient?user_id={patient}", None, 3),
+        ("GET", f"/api/complete-profile/{donor}", None, 2),
+        ("POST", "/api/search", {"blood_type": "O+", "limit": 100}, 1),
+        ("GET", "/api/profiles?limit=100", None, 1),
+        ("GET", "/api/export/donor", None, 2),
+        ("GET", "/api/inventory/search?blood_group=O%2B&lat=19.076&lon=72.8777", None, 1),
+        ("GET", "/api/stats", None, 1),
+        ("GET", "/api/stats/detailed?city=Mumbai", None, 1),
+    ]
+
+
+def sample_ids():
+    """Ids of the first seeded patient, donor and hospital (they have known logins)."""
+    db = SessionLocal()
+    try:
+        ids = {}
+        for user_type in ("patient", "donor", "hospital"):
+            user = db.query(User).filter(User.email == seed_email(user_type, 0)).first()
+            if user is None:
+                raise SystemExit(f"No seeded {user_type} found; run with --seed N first")
+            ids[user_type] = str(user.id)
+        return ids
+    finally:
+        db.close()
+
+
+def auth_header(ids, url: str):
+    """Bearer token for the seeded user a URL refers to (patient for shared routes, hospital for bulk routes)."""
+    if url.startswith(("/api/bulk/", "/api/export/")):
+        return {"Authorization": f"Bearer {tokens.issue_token(ids['hospital'], 'hospital')[0]}"}
+    for user_type, user_id in ids.items():
+        if user_id in url:
+            return {"Authorization": f"Bearer {tokens.issue_token(user_id, user_type)[0]}"}
+    return {"Authorization": f"Bearer {tokens.issue_token(ids['patient'], 'patient')[0]}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0, help="seed N users of each type first (fresh database only)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print statement counts for passing routes")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+
+    client = TestClient(app)
+    failures = 0
+    ids = sample_ids()
+    for method, url, body, budget in route_budgets(ids):
+        label = f"{method} {url}"
+        try:
+            with assert_max_queries(budget, label=label) as counter:
+                response = client.request(method, url, json=body, headers=auth_header(ids, url))
+                response.read()
+        except QueryBudgetExceeded as exc:
+            failures += 1
+            print(f"FAIL {exc}")
+            continue
+        if response.status_code >= 400:
+            failures += 1
+            print(f"FAIL {label}: HTTP {response.status_code} {response.text[:200]}")
+        elif args.verbose:
+            print(f"ok   {label}: {counter.count}/{budget}")
+
+    if failures:
+        print(f"{failures} route(s) failed their query budget")
+        sys.exit(1)
+    print("All routes within query budget")
+
+
+if __name__ == "__main__":
+    main()
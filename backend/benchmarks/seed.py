@@ -0,0 +1,106 @@
+"""
+Seed a database with synthetic patients, donors and hospitals.
+
+Used by the query budget check and the load tests. Every seeded user has the
+email `<user_type><n>@seed.example.com` and the password `SEED_PASSWORD`,
+so login can be exercised against known credentials.
+
+Run from the backend directory (creates tables if they are missing):
+    python -m benchmarks.seed --per-type 1000
+"""
+import argparse
+import random
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+
+import crud
+import migrate
+from database import engine
+from models import User, Profile, Patient, Donor, Hospital
+
+SEED_PASSWORD = "SeedPassword123"
+SEED_EMAIL_DOMAIN = "seed.example.com"
+
+CITIES = [
+    ("Mumbai", "Maharashtra"), ("Pune", "Maharashtra"), ("Delhi", "Delhi"),
+    ("Bengaluru", "Karnataka"), ("Chennai", "Tamil Nadu"), ("Hyderabad", "Telangana"),
+    ("Kolkata", "West Bengal"), ("Ahmedabad", "Gujarat"), ("Jaipur", "Rajasthan"),
+    ("Lucknow", "Uttar Pradesh"),
+]
+# Approximate ABO/Rh distribution in India
+BLOOD_TYPES = ["O+", "B+", "A+", "AB+", "O-", "B-", "A-", "AB-"]
+BLOOD_TYPE_WEIGHTS = [0.36, 0.32, 0.22, 0.07, 0.012, 0.011, 0.006, 0.002]
+SERVICES = ["Emergency", "Surgery", "Blood Bank", "Oncology", "Cardiology", "Pharmacy"]
+
+
+def seed_email(user_type: str, n: int) -> str:
+    return f"{user_type}{n}@{SEED_EMAIL_DOMAIN}"
+
+
+def _rows(user_type: str, start: int, count: int, password_hash: str, rng: random.Random):
+    users, profiles, roles = [], [], []
+    today = date.today()
+    for n in range(start, start + count):
+        user_id = uuid.uuid4()
+        city, state = rng.choice(CITIES)
+        users.append({"id": user_id, "email": seed_email(user_type, n), "password_hash": password_hash})
+        profiles.append({
+            "id": user_id, "user_type": user_type, "first_name": f"Seed{n}",
+            "last_name": user_type.title(), "phone": f"9{rng.randrange(10**9):09d}",
+            "city": city, "state": state, "country": "India", "is_active": True,
+        })
+        blood_type = rng.choices(BLOOD_TYPES, BLOOD_TYPE_WEIGHTS)[0]
+        if user_type == "patient":
+            roles.append({
+                "id": user_id, "age": rng.randint(2, 40), "blood_type": blood_type,
+                "thalassemia_type": rng.choice(["alpha", "beta"]),
+                "severity_level": rng.choice(["minor", "intermedia", "major"]),
+            })
+        elif user_type == "donor":
+            last_donation = None
+            if rng.random() < 0.7:
+                last_donation = today - timedelta(days=rng.randint(1, 365))
+            roles.append({
+                "id": user_id, "age": rng.randint(18, 60), "blood_type": blood_type,
+                "last_donation_date": last_donation, "total_donations": rng.randint(0, 30),
+                "available": rng.random() < 0.8, "health_conditions": [],
+            })
+        else:
+            roles.append({
+                "id": user_id, "hospital_name": f"{city} Care Hospital {n}",
+                "services": rng.sample(SERVICES, rng.randint(1, 4)),
+                "thalassemia_specialist": rng.random() < 0.4,
+                "rating": round(rng.uniform(3.0, 5.0), 2), "insurance_accepted": [],
+            })
+    return users, profiles, roles
+
+
+def seed(per_type: int, batch_size: int = 5000, seed_value: int = 42):
+    """Insert `per_type` patients, donors and hospitals in batched executemany calls."""
+    migrate.upgrade()
+    rng = random.Random(seed_value)
+    password_hash = crud.hash_password(SEED_PASSWORD)
+    role_tables = {"patient": Patient, "donor": Donor, "hospital": Hospital}
+    with engine.begin() as conn:
+        for user_type, role_model in role_tables.items():
+            for start in range(0, per_type, batch_size):
+                count = min(batch_size, per_type - start)
+                users, profiles, roles = _rows(user_type, start, count, password_hash, rng)
+                conn.execute(insert(User), users)
+                conn.execute(insert(Profile), profiles)
+                conn.execute(insert(role_model), roles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-type", type=int, default=1000, help="users to create for each user type")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    seed(args.per_type, args.batch_size)
+    print(f"Seeded {args.per_type} patients, donors and hospitals")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Serialization benchmark for list routes.
+
+Compares the old path (raw SQLAlchemy rows -> jsonable_encoder -> JSONResponse)
+with the response-model path (from_attributes validation -> ORJSONResponse)
+for a `/donors/available`-shaped page.
+
+Run from the backend directory:
+    python -m benchmarks.serialization --rows 1000 --repeat 20
+"""
+import argparse
+import time
+import uuid
+from datetime import date, datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from models import Profile, Donor
+from schemas import DonorListResponse
+
+
+def build_page(rows: int):
+    """Build a page of transient ORM rows shaped like the donor list route."""
+    now = datetime.now(timezone.utc)
+    donors = []
+    for i in range(rows):
+        user_id = uuid.uuid4()
+        profile = Profile(
+            id=user_id, user_type="donor", first_name=f"Donor{i}", last_name="Bench",
+            phone="9876543210", address="12 MG Road", city="Mumbai", state="Maharashtra",
+            country="India", is_active=True, created_at=now, updated_at=now
+        )
+        donor = Donor(
+            id=user_id, age=30, gender="female", blood_type="O+",
+            last_donation_date=date(2024, 1, 15), total_donations=i % 20, available=True,
+            contact_preference="email", emergency_contact=False, health_conditions=[]
+        )
+        donors.append({"profile": profile, "donor_data": donor})
+    return {"donors": donors, "count": len(donors)}
+
+
+def encoder_path(page):
+    return JSONResponse(jsonable_encoder(page)).body
+
+
+def response_model_path(page):
+    model = DonorListResponse.model_validate(page)
+    return ORJSONResponse(model.model_dump(mode="json")).body
+
+
+def timeit(fn, page, repeat: int) -> float:
+    fn(page)  # warm up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(page)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=20, help="timed iterations (best is reported)")
+    args = parser.parse_args()
+
+    page = build_page(args.rows)
+    if len(encoder_path(page)) == 0 or len(response_model_path(page)) == 0:
+        raise SystemExit("empty response body")
+
+    print(f"{'path':<28}{'page ms':>10}{'per row us':>12}")
+    for name, fn in (("jsonable_encoder+JSON", encoder_path), ("response_model+ORJSON", response_model_path)):
+        seconds = timeit(fn, page, args.repeat)
+        print(f"{name:<28}{seconds * 1e3:>10.2f}{seconds / args.rows * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Per-request vs process-wide Supabase client in src/register.py.
+
+Starts a local PostgREST/GoTrue stand-in (a small Starlette app on uvicorn)
+unless --url points at a real project (e.g. `supabase start`), then calls the
+register.py routes through TestClient twice: once with a fresh client built
+per request (the old behaviour, via a dependency override) and once with the
+shared client from the lifespan hook. Prints p50/p95 per route for both.
+`--latency-ms` delays every stand-in response to mimic a network round trip,
+which is what the concurrent /stats calls and the single signup RPC save.
+
+Run from the backend directory:
+    python -m benchmarks.supabase_client --requests 500 --latency-ms 5
+    python -m benchmarks.supabase_client --url http://127.0.0.1:54321 --key <service role key>
+"""
+import argparse
+import asyncio
+import os
+import socket
+import threading
+import time
+import uuid
+
+STAND_IN_KEY = "stand-in-service-key"
+PROFILE_ID = str(uuid.uuid4())
+
+
+def stand_in_app(latency: float = 0.0):
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    profile = {
+        "id": PROFILE_ID, "user_type": "donor", "first_name": "Stand", "last_name": "In",
+        "city": "Mumbai", "state": "Maharashtra", "is_active": True,
+    }
+    user = {
+        "id": PROFILE_ID, "aud": "authenticated", "role": "authenticated", "email": "stand-in@example.com",
+        "app_metadata": {}, "user_metadata": {}, "created_at": "2024-01-01T00:00:00Z",
+    }
+
+    async def table(request):
+        await asyncio.sleep(latency)
+        if "vnd.pgrst.object" in request.headers.get("accept", ""):
+            return JSONResponse(profile)
+        return JSONResponse([profile], headers={"content-range": "0-0/1"})
+
+    async def token(request):
+        await asyncio.sleep(latency)
+        return JSONResponse({
+            "access_token": "stand-in-token", "token_type": "bearer", "expires_in": 3600,
+            "expires_at": int(time.time()) + 3600, "refresh_token": "stand-in-refresh", "user": user,
+        })
+
+    async def signup(request):
+        await asyncio.sleep(latency)
+        return JSONResponse(user)
+
+    async def rpc(request):
+        await asyncio.sleep(latency)
+        return JSONResponse(None)
+
+    return Starlette(routes=[
+        Route("/rest/v1/rpc/{function}", rpc, methods=["POST"]),
+        Route("/rest/v1/{table}", table, methods=["GET", "POST", "PATCH"]),
+        Route("/auth/v1/token", token, methods=["POST"]),
+        Route("/auth/v1/signup", signup, methods=["POST"]),
+    ])
+
+
+def start_stand_in(latency: float = 0.0) -> str:
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(stand_in_app(latency), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def routes(profile_id: str):
+    return {
+        "login": ("POST", "/login", {"email": "stand-in@example.com", "password": "StandInPassword123"}),
+        "signup": ("POST", "/signup", {
+            "email": "stand-in@example.com", "password": "StandInPassword123", "user_type": "donor",
+            "first_name": "Stand", "last_name": "In", "blood_type": "O+",
+        }),
+        "profiles": ("GET", "/profiles?limit=10", None),
+        "profile_detail": ("GET", f"/profiles/{profile_id}", None),
+        "stats": ("GET", "/stats", None),
+    }
+
+
+def measure(client, method, path, body, total: int):
+    latencies = []
+    for _ in range(total):
+        start = time.perf_counter()
+        response = client.request(method, path, json=body)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            raise SystemExit(f"{method} {path}: HTTP {response.status_code} {response.text[:200]}")
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1e3, latencies[int(len(latencies) * 0.95)] * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Supabase URL (default: start a local stand-in)")
+    parser.add_argument("--key", help="service role key for --url")
+    parser.add_argument("--profile-id", default=PROFILE_ID, help="existing profile id for --url")
+    parser.add_argument("--requests", type=int, default=300, help="requests per route and mode")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="stand-in response delay")
+    args = parser.parse_args()
+
+    os.environ["VITE_SUPABASE_URL"] = args.url or start_stand_in(args.latency_ms / 1e3)
+    os.environ["SUPABASE_SERVICE_ROLE_KEY"] = args.key or STAND_IN_KEY
+
+    from fastapi.testclient import TestClient
+
+    from src.register import app, get_auth, get_supabase
+    from utils.supabase_client import get_async_Supabase, get_auth_client
+
+    async def fresh_supabase():
+        return await get_async_Supabase()
+
+    def fresh_auth():
+        return get_auth_client()
+
+    print(f"{'route':<16}{'per-request p50':>17}{'p95':>9}{'shared p50':>13}{'p95':>9}")
+    with TestClient(app) as client:
+        for name, (method, path, body) in routes(args.profile_id).items():
+            # Old behaviour: a brand-new client (and connections) per request
+            app.dependency_overrides[get_supabase] = fresh_supabase
+            app.dependency_overrides[get_auth] = fresh_auth
+            measure(client, method, path, body, 10)
+            before = measure(client, method, path, body, args.requests)
+            app.dependency_overrides.clear()
+            measure(client, method, path, body, 10)
+            after = measure(client, method, path, body, args.requests)
+            print(f"{name:<16}{before[0]:>14.2f} ms{before[1]:>9.2f}{after[0]:>10.2f} ms{after[1]:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,11 @@
-from database import Base, engine
-from models import *
 from sqlalchemy.exc import OperationalError
 
-print("Creating all tables...")
+import migrate
+
+print("Applying database migrations...")
 try:
-    Base.metadata.create_all(bind=engine)
-    print("Tables created successfully!")
+    migrate.upgrade()
+    print("Database schema is up to date!")
 except OperationalError as e:
     print("Failed to connect to the database:")
     print(str(e).strip())
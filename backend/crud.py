@@ -1,40 +1,95 @@
 # crud.py
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from models import User, Profile, Patient, Donor, Hospital
-import hashlib
+from sqlalchemy import and_, or_, func, select, update, cast, column, values as sql_values
+from sqlalchemy.dialects.postgresql import array
+from models import User, RevokedToken, Profile, Patient, Donor, Hospital, BloodBank, donor_last_donation_key
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from distance import EARTH_RADIUS_KM
+from datetime import date, datetime, timedelta, timezone
+import math
+import os
 import uuid
+import passwords
 from schemas import (
     UserCreate, PatientProfile, DonorProfile, HospitalProfile,
     ProfileUpdate, PatientUpdate, DonorUpdate, HospitalUpdate
 )
 
+# Minimum gap between whole-blood donations (NBTC guideline: 90 days)
+DONOR_DEFERRAL_DAYS = int(os.getenv("DONOR_DEFERRAL_DAYS", "90"))
+
+# Registration fields that belong to users/profiles rather than the role tables
+NON_ROLE_FIELDS = {'email', 'password', 'first_name', 'last_name', 'phone', 'address', 'city', 'state', 'country'}
+
 def hash_password(password: str) -> str:
-    """Hash a password using SHA-256."""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash a password with scrypt (see passwords.py)."""
+    return passwords.hash_password(password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return hash_password(plain_password) == hashed_password
+def verify_password(plain_password: str, hashed_password: str) -> tuple:
+    """Verify a password against its hash; returns (matches, needs_rehash)."""
+    return passwords.verify_password(plain_password, hashed_password)
 
 # User operations
 def get_user_by_email(db: Session, email: str) -> User:
-    """Get a user by email."""
-    return db.query(User).filter(User.email == email).first()
+    """Get a user by email (case-insensitive)."""
+    return db.query(User).filter(func.lower(User.email) == email.lower()).first()
+
+def get_login_credentials(db: Session, email: str):
+    """
+    Get (id, email, password_hash, user_type) for a login in one statement.
+
+    Matches the email case-insensitively with an index-only scan of the
+    covering idx_users_email_lower, and joins the profile for its user_type
+    (None if the user has no profile).
+    """
+    return (
+        db.query(User.id, User.email, User.password_hash, Profile.user_type)
+        .outerjoin(Profile, Profile.id == User.id)
+        .filter(func.lower(User.email) == email.lower())
+        .first()
+    )
 
 def get_user_by_id(db: Session, user_id: str) -> User:
     """Get a user by ID."""
     return db.query(User).filter(User.id == user_id).first()
 
+def update_password_hash(db: Session, user_id, password_hash: str):
+    """Replace a user's stored password hash (rehash on login)."""
+    db.query(User).filter(User.id == user_id).update({"password_hash": password_hash}, synchronize_session=False)
+    db.commit()
+
 def create_user(db: Session, email: str, password: str) -> User:
-    """Create a new user."""
+    """Create a new user; None if the email (in any case) is already registered.
+
+    Callers check for the email first, but two concurrent sign-ups can both
+    pass that check; the second then trips idx_users_email_lower.
+    """
     hashed_password = hash_password(password)
     db_user = User(email=email, password_hash=hashed_password)
     db.add(db_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
     db.refresh(db_user)
     return db_user
 
+# Session token revocation
+def revoke_token(db: Session, token_id: str, user_id: str, expires_at: int):
+    """Record a token as revoked until its natural expiry."""
+    statement = pg_insert(RevokedToken).values(
+        jti=token_id,
+        user_id=user_id,
+        expires_at=datetime.fromtimestamp(expires_at, tz=timezone.utc)
+    ).on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+    db.execute(statement)
+    db.commit()
+
+def is_token_revoked(db: Session, token_id: str) -> bool:
+    return db.query(RevokedToken.jti).filter(RevokedToken.jti == token_id).first() is not None
+
 # Profile operations
 def get_profile(db: Session, user_id: str) -> Profile:
     """Get a profile by user ID."""
@@ -54,24 +109,28 @@ def create_profile(db: Session, user_id: str, user_type: str, profile_data: dict
     db.refresh(db_profile)
     return db_profile
 
-def update_profile(db: Session, user_id: str, profile_data: ProfileUpdate) -> Profile:
-    """Update a profile."""
-    db_profile = get_profile(db, user_id)
-    if not db_profile:
-        return None
-    
-    update_data = profile_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_profile, key, value)
-    
+def _update_returning(db: Session, model, user_id: str, values: dict):
+    """
+    UPDATE ... WHERE id = :id RETURNING * in one statement.
+
+    Returns the updated row (a Row, not an ORM instance) or None when no row
+    has that id. With nothing to set it only checks that the row exists.
+    """
+    table = model.__table__
+    if not values:
+        return db.execute(select(table).where(table.c.id == user_id)).first()
+    row = db.execute(update(table).where(table.c.id == user_id).values(**values).returning(*table.c)).first()
     db.commit()
-    db.refresh(db_profile)
-    return db_profile
+    return row
+
+def update_profile(db: Session, user_id: str, profile_data: ProfileUpdate):
+    """Update a profile; returns the updated row, or None if there is none."""
+    return _update_returning(db, Profile, user_id, profile_data.dict(exclude_unset=True))
 
 # Patient operations
 def create_patient_profile(db: Session, user_id: str, patient_data: PatientProfile) -> Patient:
     """Create a patient profile."""
-    patient_dict = patient_data.dict(exclude={'first_name', 'last_name', 'phone', 'address', 'city', 'state', 'country'})
+    patient_dict = patient_data.dict(exclude=NON_ROLE_FIELDS)
     db_patient = Patient(id=user_id, **patient_dict)
     db.add(db_patient)
     db.commit()
@@ -88,24 +147,14 @@ def get_patient(db: Session, user_id: str) -> Patient:
             return None
     return db.query(Patient).filter(Patient.id == user_id).first()
 
-def update_patient(db: Session, user_id: str, patient_data: PatientUpdate) -> Patient:
-    """Update patient information."""
-    db_patient = get_patient(db, user_id)
-    if not db_patient:
-        return None
-    
-    update_data = patient_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_patient, key, value)
-    
-    db.commit()
-    db.refresh(db_patient)
-    return db_patient
+def update_patient(db: Session, user_id: str, patient_data: PatientUpdate):
+    """Update patient information; returns the updated row, or None if there is none."""
+    return _update_returning(db, Patient, user_id, patient_data.dict(exclude_unset=True))
 
 # Donor operations
 def create_donor_profile(db: Session, user_id: str, donor_data: DonorProfile) -> Donor:
     """Create a donor profile."""
-    donor_dict = donor_data.dict(exclude={'first_name', 'last_name', 'phone', 'address', 'city', 'state', 'country'})
+    donor_dict = donor_data.dict(exclude=NON_ROLE_FIELDS)
     db_donor = Donor(id=user_id, **donor_dict)
     db.add(db_donor)
     db.commit()
@@ -122,24 +171,90 @@ def get_donor(db: Session, user_id: str) -> Donor:
             return None
     return db.query(Donor).filter(Donor.id == user_id).first()
 
-def update_donor(db: Session, user_id: str, donor_data: DonorUpdate) -> Donor:
-    """Update donor information."""
-    db_donor = get_donor(db, user_id)
-    if not db_donor:
-        return None
-    
-    update_data = donor_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_donor, key, value)
-    
+def update_donor(db: Session, user_id: str, donor_data: DonorUpdate):
+    """Update donor information; returns the updated row, or None if there is none."""
+    return _update_returning(db, Donor, user_id, donor_data.dict(exclude_unset=True))
+
+def bulk_update_donors(db: Session, updates: list) -> set:
+    """
+    Apply per-donor changes, given as (donor_id, {column: value}) pairs, in one
+    transaction. Donors changing the same set of columns share one
+    UPDATE donors ... FROM (VALUES ...) statement. Returns the ids of the
+    donors that exist (and were updated).
+    """
+    table = Donor.__table__
+    groups = {}
+    unchanged = []
+    for donor_id, changes in updates:
+        if changes:
+            groups.setdefault(tuple(sorted(changes)), []).append((donor_id, changes))
+        else:
+            unchanged.append(donor_id)
+
+    found = set()
+    for columns, rows in groups.items():
+        data = sql_values(
+            column("id", table.c.id.type),
+            *(column(name, table.c[name].type) for name in columns),
+            name="data"
+        ).data([(donor_id, *(changes[name] for name in columns)) for donor_id, changes in rows])
+        statement = (
+            update(table)
+            .where(table.c.id == data.c.id)
+            # Cast back to the column type: an all-NULL VALUES column is typed text
+            .values({name: cast(data.c[name], table.c[name].type) for name in columns})
+            .returning(table.c.id)
+        )
+        found.update(db.execute(statement).scalars())
+    if unchanged:
+        found.update(db.execute(select(table.c.id).where(table.c.id.in_(unchanged))).scalars())
     db.commit()
-    db.refresh(db_donor)
-    return db_donor
+    return found
+
+def bulk_patch_donors(
+    db: Session,
+    changes: dict,
+    blood_type: str = None,
+    city: str = None,
+    state: str = None,
+    available: bool = None,
+    max_rows: int = None
+) -> list:
+    """
+    Apply the same changes to every donor matching the filters in one UPDATE;
+    returns their ids. With `max_rows`, matches are counted first (reading at
+    most max_rows + 1 ids, without locking) and ValueError is raised, before
+    anything is updated, if there are more.
+    """
+    table = Donor.__table__
+    conditions = []
+    if blood_type:
+        conditions.append(table.c.blood_type == blood_type)
+    if available is not None:
+        conditions.append(table.c.available == available)
+    if city or state:
+        # UPDATE donors ... FROM profiles
+        conditions.append(table.c.id == Profile.id)
+        if city:
+            conditions.append(Profile.city.ilike(f"%{city}%"))
+        if state:
+            conditions.append(Profile.state.ilike(f"%{state}%"))
+
+    if max_rows is not None:
+        matched = db.execute(select(table.c.id).where(*conditions).limit(max_rows + 1)).scalars().all()
+        if len(matched) > max_rows:
+            db.rollback()
+            raise ValueError(f"Filter matches more than {max_rows} donors; at most {max_rows} can be updated at once")
+
+    statement = update(table).where(*conditions).values(**changes).returning(table.c.id)
+    ids = list(db.execute(statement).scalars())
+    db.commit()
+    return ids
 
 # Hospital operations
 def create_hospital_profile(db: Session, user_id: str, hospital_data: HospitalProfile) -> Hospital:
     """Create a hospital profile."""
-    hospital_dict = hospital_data.dict(exclude={'first_name', 'last_name', 'phone', 'address', 'city', 'state', 'country'})
+    hospital_dict = hospital_data.dict(exclude=NON_ROLE_FIELDS)
     db_hospital = Hospital(id=user_id, **hospital_dict)
     db.add(db_hospital)
     db.commit()
@@ -156,34 +271,37 @@ def get_hospital(db: Session, user_id: str) -> Hospital:
             return None
     return db.query(Hospital).filter(Hospital.id == user_id).first()
 
-def update_hospital(db: Session, user_id: str, hospital_data: HospitalUpdate) -> Hospital:
-    """Update hospital information."""
-    db_hospital = get_hospital(db, user_id)
-    if not db_hospital:
-        return None
-    
-    update_data = hospital_data.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_hospital, key, value)
-    
-    db.commit()
-    db.refresh(db_hospital)
-    return db_hospital
+def update_hospital(db: Session, user_id: str, hospital_data: HospitalUpdate):
+    """Update hospital information; returns the updated row, or None if there is none."""
+    return _update_returning(db, Hospital, user_id, hospital_data.dict(exclude_unset=True))
+
+# Eligibility
+def donor_eligible_clause(as_of: date = None):
+    """SQL condition for donors who can donate on `as_of` (default: today)."""
+    cutoff = (as_of or date.today()) - timedelta(days=DONOR_DEFERRAL_DAYS)
+    return and_(Donor.available == True, donor_last_donation_key <= cutoff)
 
 # Search operations
-def search_profiles(
+def _search_query(
     db: Session,
+    role_model=None,
     user_type: str = None,
     blood_type: str = None,
     city: str = None,
     state: str = None,
     thalassemia_specialist: bool = None,
     available: bool = None,
-    limit: int = 50,
-    offset: int = 0
+    eligible_only: bool = False
 ):
-    """Search for profiles based on criteria."""
-    query = db.query(Profile).filter(Profile.is_active == True)
+    """Build the filtered profile query; every filter is applied in SQL.
+
+    With `role_model`, rows are (Profile, role) pairs inner-joined on id.
+    """
+    if role_model is not None:
+        query = db.query(Profile, role_model).join(role_model, role_model.id == Profile.id)
+    else:
+        query = db.query(Profile)
+    query = query.filter(Profile.is_active == True)
     
     if user_type:
         query = query.filter(Profile.user_type == user_type)
@@ -192,54 +310,258 @@ def search_profiles(
     if state:
         query = query.filter(Profile.state.ilike(f"%{state}%"))
     
-    profiles = query.offset(offset).limit(limit).all()
-    
-    # Filter by blood type for patients and donors
+    # Blood type applies to patients and donors
     if blood_type:
-        filtered_profiles = []
-        for profile in profiles:
-            if profile.user_type == 'patient':
-                patient = get_patient(db, profile.id)
-                if patient and patient.blood_type == blood_type:
-                    filtered_profiles.append(profile)
-            elif profile.user_type == 'donor':
-                donor = get_donor(db, profile.id)
-                if donor and donor.blood_type == blood_type:
-                    filtered_profiles.append(profile)
-        profiles = filtered_profiles
+        if role_model is Donor:
+            query = query.filter(Donor.blood_type == blood_type)
+        elif role_model is Patient:
+            query = query.filter(Patient.blood_type == blood_type)
+        else:
+            query = (
+                query.outerjoin(Patient, Patient.id == Profile.id)
+                .outerjoin(Donor, Donor.id == Profile.id)
+                .filter(or_(Patient.blood_type == blood_type, Donor.blood_type == blood_type))
+            )
     
-    # Filter by thalassemia specialist for hospitals
-    if thalassemia_specialist is not None:
-        filtered_profiles = []
-        for profile in profiles:
-            if profile.user_type == 'hospital':
-                hospital = get_hospital(db, profile.id)
-                if hospital and hospital.thalassemia_specialist == thalassemia_specialist:
-                    filtered_profiles.append(profile)
-        profiles = filtered_profiles
+    # Availability and eligibility apply to donors only
+    if available is not None or eligible_only:
+        if role_model is None and not blood_type:
+            query = query.join(Donor, Donor.id == Profile.id)
+        if available is not None:
+            query = query.filter(Donor.available == available)
+        if eligible_only:
+            query = query.filter(donor_eligible_clause()).order_by(donor_last_donation_key)
     
-    # Filter by availability for donors
-    if available is not None:
-        filtered_profiles = []
-        for profile in profiles:
-            if profile.user_type == 'donor':
-                donor = get_donor(db, profile.id)
-                if donor and donor.available == available:
-                    filtered_profiles.append(profile)
-        profiles = filtered_profiles
+    # Specialist flag applies to hospitals only
+    if thalassemia_specialist is not None:
+        if role_model is not Hospital:
+            query = query.join(Hospital, Hospital.id == Profile.id)
+        query = query.filter(Hospital.thalassemia_specialist == thalassemia_specialist)
     
-    return profiles
+    return query
+
+def search_profiles(
+    db: Session,
+    user_type: str = None,
+    blood_type: str = None,
+    city: str = None,
+    state: str = None,
+    thalassemia_specialist: bool = None,
+    available: bool = None,
+    eligible_only: bool = False,
+    limit: int = 50,
+    offset: int = 0,
+    exclude_user_types: tuple = ()
+):
+    """Search for profiles based on criteria.
+
+    With `eligible_only`, only donors who are available and past the
+    inter-donation deferral window are returned, served by `idx_donors_eligible`.
+    Profiles of the types in `exclude_user_types` are left out.
+    """
+    query = _search_query(
+        db, None, user_type, blood_type, city, state,
+        thalassemia_specialist, available, eligible_only
+    )
+    if exclude_user_types:
+        query = query.filter(Profile.user_type.notin_(exclude_user_types))
+    return query.offset(offset).limit(limit).all()
+
+def search_donors(
+    db: Session,
+    blood_type: str = None,
+    city: str = None,
+    state: str = None,
+    available: bool = None,
+    eligible_only: bool = False,
+    limit: int = 50,
+    offset: int = 0
+):
+    """Search donors, returning (profile, donor) pairs in one query."""
+    query = _search_query(
+        db, Donor, "donor", blood_type, city, state,
+        available=available, eligible_only=eligible_only
+    )
+    return query.offset(offset).limit(limit).all()
+
+def search_hospitals(
+    db: Session,
+    city: str = None,
+    state: str = None,
+    thalassemia_specialist: bool = None,
+    services: list = None,
+    limit: int = 50,
+    offset: int = 0
+):
+    """Search hospitals, returning (profile, hospital) pairs in one query.
+
+    `services` matches hospitals offering any of the listed services.
+    """
+    query = _search_query(
+        db, Hospital, "hospital", city=city, state=state,
+        thalassemia_specialist=thalassemia_specialist
+    )
+    if services:
+        query = query.filter(Hospital.services.op("&&")(array(services)))
+    return query.offset(offset).limit(limit).all()
+
+def get_patient_with_profile(db: Session, user_id: str):
+    """Get (patient, profile) for a user ID in one query, or None."""
+    if isinstance(user_id, str):
+        try:
+            user_id = uuid.UUID(user_id)
+        except ValueError:
+            return None
+    return (
+        db.query(Patient, Profile)
+        .join(Profile, Profile.id == Patient.id)
+        .filter(Patient.id == user_id)
+        .first()
+    )
+
+# Export operations
+ROLE_MODELS = {"patient": Patient, "donor": Donor, "hospital": Hospital}
+
+def iter_profiles_with_role(db: Session, user_type: str, batch_size: int = 1000):
+    """Stream active (profile, role) rows for a user type from a server-side cursor.
+
+    Rows are fetched `batch_size` at a time, so memory stays flat no matter
+    how many rows the export covers.
+    """
+    role_model = ROLE_MODELS[user_type]
+    query = (
+        db.query(Profile, role_model)
+        .join(role_model, role_model.id == Profile.id)
+        .filter(and_(Profile.user_type == user_type, Profile.is_active == True))
+        .order_by(Profile.id)
+        .yield_per(batch_size)
+    )
+    for profile, role in query:
+        yield profile, role
+
+# Blood bank inventory
+# Bit order matches datasets/augment_data_types.py (Blood_Group_Mask column)
+BLOOD_TYPES = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"]
+BLOOD_TYPE_BITS = {t: 1 << i for i, t in enumerate(BLOOD_TYPES)}
+KM_PER_DEGREE_LAT = 111.045
+
+def blood_group_mask(groups) -> int:
+    """Mask for an iterable of groups or a pipe-joined string such as "A+|O-"."""
+    if isinstance(groups, str):
+        groups = groups.split("|")
+    return sum(BLOOD_TYPE_BITS[g.strip()] for g in set(groups) if g.strip() in BLOOD_TYPE_BITS)
+
+def blood_groups_from_mask(mask: int) -> list:
+    return [t for t in BLOOD_TYPES if mask & BLOOD_TYPE_BITS[t]]
+
+def bounding_box(latitude: float, longitude: float, radius_km: float):
+    """(min_lat, max_lat, min_lon, max_lon) enclosing a radius around a point."""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    dlon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(latitude)), 0.01))
+    return latitude - dlat, latitude + dlat, longitude - dlon, longitude + dlon
+
+def _haversine_km(latitude: float, longitude: float):
+    """SQL expression: great-circle distance from a point to each blood bank."""
+    lat1, lon1 = math.radians(latitude), math.radians(longitude)
+    lat2, lon2 = func.radians(BloodBank.latitude), func.radians(BloodBank.longitude)
+    a = (
+        func.power(func.sin((lat2 - lat1) / 2), 2)
+        + math.cos(lat1) * func.cos(lat2) * func.power(func.sin((lon2 - lon1) / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(1.0, func.sqrt(a)))
+
+def search_inventory(
+    db: Session,
+    blood_group: str,
+    latitude: float,
+    longitude: float,
+    radius_km: float = 25.0,
+    min_units: int = 1,
+    emergency_only: bool = False,
+    limit: int = 20
+):
+    """Blood banks carrying `blood_group` within `radius_km`, nearest first.
+
+    A bounding box on idx_blood_banks_lat_lon narrows the candidates before the
+    exact haversine distance is computed. Returns (BloodBank, distance_km) pairs.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    distance = _haversine_km(latitude, longitude).label("distance_km")
+    query = (
+        db.query(BloodBank, distance)
+        .filter(
+            BloodBank.latitude.between(min_lat, max_lat),
+            BloodBank.longitude.between(min_lon, max_lon),
+            BloodBank.blood_group_mask.op("&")(BLOOD_TYPE_BITS[blood_group]) != 0,
+            BloodBank.units_available >= min_units,
+            distance <= radius_km
+        )
+    )
+    if emergency_only:
+        query = query.filter(BloodBank.emergency_support == True)
+    return query.order_by(distance).limit(limit).all()
+
+def upsert_blood_banks(db: Session, rows: list):
+    """Insert or refresh blood bank rows (dicts keyed by BloodBank columns)."""
+    if not rows:
+        return
+    statement = pg_insert(BloodBank)
+    statement = statement.on_conflict_do_update(
+        index_elements=[BloodBank.id],
+        set_={
+            column.name: statement.excluded[column.name]
+            for column in BloodBank.__table__.columns
+            if column.name not in ("id", "updated_at")
+        } | {"updated_at": func.now()}
+    )
+    db.execute(statement, rows)
+    db.commit()
 
 # Statistics
+USER_TYPES = ['patient', 'donor', 'hospital']
+
 def get_stats(db: Session):
     """Get statistics for each user type."""
-    stats = {}
-    user_types = ['patient', 'donor', 'hospital']
+    rows = (
+        db.query(Profile.user_type, func.count())
+        .filter(and_(Profile.user_type.in_(USER_TYPES), Profile.is_active == True))
+        .group_by(Profile.user_type)
+        .all()
+    )
+    counts = dict(rows)
+    return {f"{user_type}_count": counts.get(user_type, 0) for user_type in USER_TYPES}
+
+def get_detailed_stats(db: Session, city: str = None, state: str = None):
+    """Get per-type counts, location-filtered counts and availability in one query."""
+    location = []
+    if city:
+        location.append(Profile.city.ilike(f"%{city}%"))
+    if state:
+        location.append(Profile.state.ilike(f"%{state}%"))
+    
+    columns = [
+        Profile.user_type,
+        func.count(),
+        func.count().filter(Donor.available == True),
+        func.count().filter(Hospital.thalassemia_specialist == True),
+    ]
+    if location:
+        columns.append(func.count().filter(and_(*location)))
     
-    for user_type in user_types:
-        count = db.query(Profile).filter(
-            and_(Profile.user_type == user_type, Profile.is_active == True)
-        ).count()
-        stats[f"{user_type}_count"] = count
+    rows = (
+        db.query(*columns)
+        .outerjoin(Donor, Donor.id == Profile.id)
+        .outerjoin(Hospital, Hospital.id == Profile.id)
+        .filter(and_(Profile.user_type.in_(USER_TYPES), Profile.is_active == True))
+        .group_by(Profile.user_type)
+        .all()
+    )
+    by_type = {row[0]: row[1:] for row in rows}
     
+    stats = {f"{t}_count": by_type.get(t, (0,))[0] for t in USER_TYPES}
+    if location:
+        stats['filtered_by_location'] = {f"{t}_count": by_type.get(t, (0, 0, 0, 0))[3] for t in USER_TYPES}
+        stats['location_filter'] = {"city": city, "state": state}
+    stats['available_donors_count'] = by_type.get('donor', (0, 0))[1]
+    stats['thalassemia_specialist_hospitals_count'] = by_type.get('hospital', (0, 0, 0))[2]
     return stats
@@ -1,5 +1,9 @@
+import itertools
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -17,3 +21,80 @@ DATABASE_URL = os.getenv(
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+# Optional streaming replicas for read-only routes, comma-separated
+# (e.g. the postgres-replica service in docker-compose.yml on port 5434)
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# A replica further behind the primary than this is skipped
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+# How often each replica's reachability and lag are re-checked
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", "5"))
+
+# Seconds of replay lag; 0 when caught up (or not a replica at all)
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class _Replica:
+    def __init__(self, url: str):
+        self.engine = create_engine(url, pool_pre_ping=True, connect_args={"connect_timeout": 2})
+        self.healthy = True
+        self.checked_at = 0.0
+
+
+class ReplicaSet:
+    """
+    Round-robin over the replicas that are reachable and within
+    REPLICA_MAX_LAG_SECONDS. Each replica is probed at most once per
+    REPLICA_CHECK_INTERVAL, by whichever request finds its status stale;
+    other requests keep using the last known status meanwhile.
+    """
+
+    def __init__(self, urls, max_lag: float = REPLICA_MAX_LAG_SECONDS, check_interval: float = REPLICA_CHECK_INTERVAL):
+        self.replicas = [_Replica(url) for url in urls]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def engines(self):
+        return [replica.engine for replica in self.replicas]
+
+    def _probe(self, replica: _Replica) -> bool:
+        try:
+            with replica.engine.connect() as conn:
+                return conn.execute(REPLICA_LAG_SQL).scalar() <= self.max_lag
+        except SQLAlchemyError:
+            return False
+
+    def _is_healthy(self, replica: _Replica) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now - replica.checked_at < self.check_interval:
+                return replica.healthy
+            replica.checked_at = now
+        replica.healthy = self._probe(replica)
+        return replica.healthy
+
+    def choose(self):
+        """Engine of the next healthy replica, or None if there is none."""
+        if not self.replicas:
+            return None
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if self._is_healthy(replica):
+                return replica.engine
+        return None
+
+
+replicas = ReplicaSet(DATABASE_REPLICA_URLS)
+
+
+def ReadSessionLocal(primary: bool = False):
+    """Session on a healthy replica, falling back to the primary (or forced with `primary`)."""
+    read_engine = None if primary else replicas.choose()
+    return SessionLocal(bind=read_engine or engine)
@@ -0,0 +1,65 @@
+"""
+Batched distance kernel for serve-time ranking and inventory search.
+
+The datasets carry a precomputed `Distance_km`, but at serve time distances
+depend on where the requester is. `distances_km` computes haversine distances
+from one or more requesters to every candidate in a single vectorized call,
+optionally scaled by a per-city road factor (road distance / great-circle
+distance) loaded from the CSV at `ROAD_FACTORS_CSV`.
+"""
+import csv
+import os
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_ROAD_FACTOR = 1.0
+ROAD_FACTORS_CSV = os.getenv("ROAD_FACTORS_CSV")
+
+
+def haversine_km(lat1_rad, lon1_rad, lat2_rad, lon2_rad, cos_lat2=None) -> np.ndarray:
+    """Great-circle distance in km; inputs in radians and broadcast together.
+
+    Pass `cos_lat2` when the candidate side is reused across calls (e.g. a
+    cached snapshot) to skip recomputing it.
+    """
+    if cos_lat2 is None:
+        cos_lat2 = np.cos(lat2_rad)
+    a = (
+        np.sin((lat2_rad - lat1_rad) / 2) ** 2
+        + np.cos(lat1_rad) * cos_lat2 * np.sin((lon2_rad - lon1_rad) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def load_road_factors(path) -> dict:
+    """CSV with `City,Road_Factor` columns -> {city: factor}."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row["City"]: float(row["Road_Factor"]) for row in csv.DictReader(f)}
+
+
+ROAD_FACTORS = load_road_factors(ROAD_FACTORS_CSV) if ROAD_FACTORS_CSV else {}
+
+
+def road_factors_for(cities, table: dict = None, default: float = DEFAULT_ROAD_FACTOR) -> np.ndarray:
+    """Per-candidate road factor; each distinct city is looked up once."""
+    table = ROAD_FACTORS if table is None else table
+    unique, inverse = np.unique(np.asarray(cities, dtype=object).astype(str), return_inverse=True)
+    return np.array([table.get(city, default) for city in unique], dtype=np.float64)[inverse]
+
+
+def distances_km(user_lat, user_lon, latitudes, longitudes, cities=None, road_factors: dict = None) -> np.ndarray:
+    """Distance from requester(s) to candidates, in km.
+
+    `user_lat`/`user_lon` are scalars (one request) or arrays aligned with the
+    candidates (many requests flattened into one batch). With `cities`, each
+    distance is multiplied by that city's road factor.
+    """
+    distance = haversine_km(
+        np.radians(user_lat), np.radians(user_lon),
+        np.radians(np.asarray(latitudes, dtype=np.float64)),
+        np.radians(np.asarray(longitudes, dtype=np.float64)),
+    )
+    if cities is not None and (road_factors or ROAD_FACTORS):
+        distance = distance * road_factors_for(cities, road_factors)
+    return distance
@@ -0,0 +1,75 @@
+"""
+Production server: gunicorn managing uvicorn workers.
+
+    gunicorn main:app -c gunicorn.conf.py
+
+The app is imported once in the master (`preload_app`) and workers are forked
+from it, so module-level data (road factors from ROAD_FACTORS_CSV, anything a
+ranker model loads at import) and the snapshot and model artifacts loaded in
+`when_ready` (warmup.py) are shared copy-on-write instead of being rebuilt per
+worker. Preloading also means all workers inherit the same SESSION_SECRET
+fallback, though production should set it.
+
+CPU budget: WEB_CONCURRENCY workers (default: one per available core) split
+the cores between them, so OMP_NUM_THREADS (used by numpy and LightGBM) and
+PASSWORD_HASH_WORKERS default to cores // workers. Each worker's threadpool is
+THREADPOOL_SIZE threads (see main.py); its DB pool is separate, so the
+database sees up to workers x (pool_size + max_overflow) connections.
+Admission lane limits (admission.py) are per worker too: with N workers the
+server admits up to N x 15 requests at once by default, so size the
+database's max_connections for N pools, or lower the ADMISSION_* limits.
+
+Metrics are per worker as well. METRICS_DIR (default: a fresh temporary
+directory) is where each worker writes its snapshot, and /metrics on any
+worker reports the sum across all of them (see metrics.py).
+"""
+import os
+import tempfile
+from pathlib import Path
+
+CPUS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+workers = int(os.getenv("WEB_CONCURRENCY", str(CPUS)))
+THREADS_PER_WORKER = max(1, CPUS // workers)
+# Set before the app is preloaded so numpy/LightGBM read them at import
+os.environ.setdefault("OMP_NUM_THREADS", str(THREADS_PER_WORKER))
+os.environ.setdefault("PASSWORD_HASH_WORKERS", str(THREADS_PER_WORKER))
+METRICS_DIR = os.environ.setdefault("METRICS_DIR", tempfile.mkdtemp(prefix="thalcare-metrics-"))
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so copy-on-write pages drift back to shared
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+
+def on_starting(server):
+    """Start from empty metrics; snapshots left by a previous run would be summed in."""
+    for stale in Path(METRICS_DIR).glob("*.json"):
+        stale.unlink()
+
+
+def when_ready(server):
+    """Load shared read-mostly data in the master, just before forking workers."""
+    import warmup
+
+    server.log.info("Preloaded shared data: %s", warmup.load_shared_data())
+
+
+def post_fork(server, worker):
+    """Connections opened in the master must not be shared with the workers."""
+    from database import engine, replicas
+
+    for forked_engine in (engine, *replicas.engines):
+        forked_engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """An exited worker's counters stay in the totals; its gauges are dropped."""
+    import metrics
+
+    metrics.mark_process_dead(worker.pid)
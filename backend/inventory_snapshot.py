@@ -0,0 +1,192 @@
+"""
+In-memory columnar snapshot of the blood bank inventory.
+
+Inventory reads tolerate a few seconds of staleness, so `/api/inventory/search`
+is answered from NumPy arrays instead of Postgres. The snapshot refreshes
+incrementally (rows whose `updated_at` moved past the last watermark) at most
+once per `ttl_seconds`, and reloads fully every `full_reload_seconds` to drop
+deleted banks. Rows re-read from the watermark overlap that the snapshot
+already holds unchanged are dropped, so a refresh with no real changes keeps
+the existing arrays (and, under gunicorn, the pages shared with the master). Queries compute haversine distances over the candidate rows in
+one vectorized pass and pick the nearest `limit` with `argpartition`.
+"""
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import crud
+from distance import haversine_km
+from models import BloodBank
+
+INVENTORY_SNAPSHOT_TTL = float(os.getenv("INVENTORY_SNAPSHOT_TTL", "5"))
+INVENTORY_FULL_RELOAD = float(os.getenv("INVENTORY_FULL_RELOAD", "300"))
+# Re-read rows this far behind the watermark: updated_at is the writer's
+# transaction start, which can precede a commit we have not seen yet
+WATERMARK_OVERLAP = timedelta(seconds=30)
+
+
+class _Columns(NamedTuple):
+    ids: dict          # bank id -> row position
+    records: list      # row position -> column dict, for responses
+    lat: np.ndarray    # degrees
+    lat_rad: np.ndarray
+    lon_rad: np.ndarray
+    cos_lat: np.ndarray
+    mask: np.ndarray   # uint8 blood group mask
+    units: np.ndarray
+    freshness: np.ndarray
+    emergency: np.ndarray
+
+
+def _build(records: list) -> _Columns:
+    count = len(records)
+    lat = np.fromiter((r["latitude"] for r in records), dtype=np.float64, count=count)
+    lon = np.fromiter((r["longitude"] for r in records), dtype=np.float64, count=count)
+    lat_rad = np.radians(lat)
+    return _Columns(
+        ids={r["id"]: i for i, r in enumerate(records)},
+        records=records,
+        lat=lat,
+        lat_rad=lat_rad,
+        lon_rad=np.radians(lon),
+        cos_lat=np.cos(lat_rad),
+        mask=np.fromiter((r["blood_group_mask"] for r in records), dtype=np.uint8, count=count),
+        units=np.fromiter((r["units_available"] for r in records), dtype=np.int32, count=count),
+        freshness=np.fromiter((r["freshness_days"] or 0 for r in records), dtype=np.int32, count=count),
+        emergency=np.fromiter((bool(r["emergency_support"]) for r in records), dtype=bool, count=count),
+    )
+
+
+def _patch(columns: _Columns, rows: list) -> _Columns:
+    """Copy of `columns` with `rows` updated in place or appended."""
+    records = list(columns.records)
+    ids = dict(columns.ids)
+    updated, added = [], []
+    for row in rows:
+        position = ids.get(row["id"])
+        if position is None:
+            ids[row["id"]] = len(records)
+            records.append(row)
+            added.append(row)
+        else:
+            records[position] = row
+            updated.append((position, row))
+    changes = _build([row for _, row in updated] + added)
+    positions = np.array([position for position, _ in updated], dtype=np.intp)
+    arrays = {}
+    for name in _Columns._fields[2:]:
+        current = getattr(columns, name)
+        fresh = getattr(changes, name)
+        array = np.concatenate([current, fresh[len(updated):]])
+        array[positions] = fresh[:len(updated)]
+        arrays[name] = array
+    return _Columns(ids=ids, records=records, **arrays)
+
+
+def _changed_rows(columns: _Columns, rows: list) -> list:
+    """`rows` minus those already in the snapshot exactly as read (watermark overlap)."""
+    changed = []
+    for row in rows:
+        position = columns.ids.get(row["id"])
+        if position is None or columns.records[position] != row:
+            changed.append(row)
+    return changed
+
+
+class InventorySnapshot:
+    def __init__(self, ttl_seconds: float = INVENTORY_SNAPSHOT_TTL, full_reload_seconds: float = INVENTORY_FULL_RELOAD):
+        self.ttl_seconds = ttl_seconds
+        self.full_reload_seconds = full_reload_seconds
+        self._columns = None
+        self._watermark = None
+        self._refreshed_at = 0.0
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, db: Session, full: bool = False):
+        """Pull changed rows (or everything) and swap in new arrays."""
+        now = time.monotonic()
+        full = full or self._columns is None or now - self._loaded_at >= self.full_reload_seconds
+        query = select(BloodBank.__table__)
+        if not full and self._watermark is not None:
+            query = query.where(BloodBank.updated_at >= self._watermark - WATERMARK_OVERLAP)
+        rows = [dict(row) for row in db.execute(query).mappings()]
+
+        # New arrays are swapped in whole, so readers holding the old ones are unaffected
+        if full:
+            self._columns = _build(rows)
+        else:
+            changed = _changed_rows(self._columns, rows)
+            if changed:
+                self._columns = _patch(self._columns, changed)
+        stamps = [row["updated_at"] for row in rows if row["updated_at"] is not None]
+        if stamps:
+            self._watermark = max(stamps + ([self._watermark] if self._watermark else []))
+        self._refreshed_at = now
+        if full:
+            self._loaded_at = now
+
+    def columns(self, db: Session) -> _Columns:
+        """Current snapshot, refreshed first if older than the TTL.
+
+        Only one request refreshes at a time; others keep serving the
+        previous snapshot rather than waiting.
+        """
+        if self._columns is not None and time.monotonic() - self._refreshed_at < self.ttl_seconds:
+            return self._columns
+        blocking = self._columns is None
+        if self._lock.acquire(blocking=blocking):
+            try:
+                if self._columns is None or time.monotonic() - self._refreshed_at >= self.ttl_seconds:
+                    self.refresh(db)
+            finally:
+                self._lock.release()
+        return self._columns
+
+    def search(
+        self,
+        db: Session,
+        blood_group: str,
+        latitude: float,
+        longitude: float,
+        radius_km: float = 25.0,
+        min_units: int = 1,
+        emergency_only: bool = False,
+        limit: int = 20
+    ):
+        """Same contract as crud.search_inventory: (record, distance_km) pairs, nearest first."""
+        cols = self.columns(db)
+        min_lat, max_lat, _, _ = crud.bounding_box(latitude, longitude, radius_km)
+        keep = (
+            ((cols.mask & crud.BLOOD_TYPE_BITS[blood_group]) != 0)
+            & (cols.units >= min_units)
+            & (cols.lat >= min_lat) & (cols.lat <= max_lat)
+        )
+        if emergency_only:
+            keep &= cols.emergency
+        candidates = np.flatnonzero(keep)
+        if not len(candidates) or limit <= 0:
+            return []
+
+        distance = haversine_km(
+            np.radians(latitude), np.radians(longitude),
+            cols.lat_rad[candidates], cols.lon_rad[candidates], cols.cos_lat[candidates]
+        )
+        within = distance <= radius_km
+        candidates, distance = candidates[within], distance[within]
+
+        if len(distance) > limit:
+            nearest = np.argpartition(distance, limit - 1)[:limit]
+        else:
+            nearest = np.arange(len(distance))
+        nearest = nearest[np.argsort(distance[nearest], kind="stable")]
+        return [(cols.records[candidates[i]], float(distance[i])) for i in nearest]
+
+
+inventory_snapshot = InventorySnapshot()
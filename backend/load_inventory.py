@@ -0,0 +1,85 @@
+"""
+Load blood bank inventory from the synthetic_blood_banks CSV into blood_banks.
+
+Rows are upserted on BloodBank_ID, so re-running refreshes stock levels in
+place. Uses the Blood_Group_Mask column when present and parses the
+pipe-joined Blood_Group column otherwise.
+
+Run from the backend directory:
+    python load_inventory.py
+    python load_inventory.py ../datasets/synthetic_blood_banks_1100_augmented.csv --batch-size 5000
+"""
+import argparse
+import csv
+from datetime import date
+from pathlib import Path
+
+import crud
+import migrate
+from database import SessionLocal
+
+DEFAULT_CSV = Path(__file__).resolve().parent.parent / "datasets" / "synthetic_blood_banks_1100_augmented.csv"
+
+
+def _optional(value, cast):
+    return cast(value) if value not in (None, "") else None
+
+
+def bank_from_row(row: dict) -> dict:
+    """One CSV row -> a dict of BloodBank column values."""
+    if row.get("Blood_Group_Mask"):
+        mask = int(row["Blood_Group_Mask"])
+    else:
+        mask = crud.blood_group_mask(row.get("Blood_Group") or "")
+    return {
+        "id": row["BloodBank_ID"],
+        "name": row["BloodBank_Name"],
+        "license_number": row.get("License_Number") or None,
+        "license_valid_till": _optional(row.get("License_Valid_Till"), date.fromisoformat),
+        "state": row.get("State") or None,
+        "city": row.get("City") or None,
+        "latitude": float(row["Latitude"]),
+        "longitude": float(row["Longitude"]),
+        "hospital_type": row.get("Hospital_Type") or None,
+        "blood_group_mask": mask,
+        "units_available": _optional(row.get("Units_Available"), int) or 0,
+        "freshness_days": _optional(row.get("Freshness_Days"), int),
+        "emergency_support": (row.get("Emergency_Support") or "").strip().lower() in ("yes", "true", "1"),
+        "rating": _optional(row.get("Rating"), float),
+        "avg_response_time_min": _optional(row.get("Avg_Response_Time_min"), int),
+        "is_govt": (row.get("Is_Govt") or "").strip().lower() in ("1", "yes", "true"),
+        "contact": row.get("Contact") or None,
+    }
+
+
+def load(path: Path, batch_size: int = 5000) -> int:
+    migrate.upgrade()
+    db = SessionLocal()
+    total = 0
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            batch = []
+            for row in csv.DictReader(f):
+                batch.append(bank_from_row(row))
+                if len(batch) >= batch_size:
+                    crud.upsert_blood_banks(db, batch)
+                    total += len(batch)
+                    batch = []
+            crud.upsert_blood_banks(db, batch)
+            total += len(batch)
+    finally:
+        db.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_path", nargs="?", type=Path, default=DEFAULT_CSV)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    count = load(args.csv_path, args.batch_size)
+    print(f"Loaded {count} blood banks from {args.csv_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,43 @@
+import os
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from api.routes import router
+from admission import AdmissionMiddleware
+from database import engine, replicas
+from metrics import MetricsMiddleware, install_query_hooks, render_metrics, start_flusher
 import uvicorn
+import warmup
+
+# Threads that run the sync route handlers, per worker. Anything above the
+# admission lane limits (15 by default) only queues on the DB pool.
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "16"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # Pool connections, mappers, snapshot/model loading and a warm-up query
+    # happen here instead of in the first requests (see warmup.py)
+    await anyio.to_thread.run_sync(warmup.run)
+    # Under gunicorn, share this worker's metrics with the others (METRICS_DIR)
+    start_flusher()
+    yield
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Thalcare AI API",
     description="API for Thalcare AI - Blood Donation Network",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Per-lane concurrency limits; overload is shed with 503 + Retry-After.
+# Added first so it runs inside CORS and the 503s stay readable by browsers.
+app.add_middleware(AdmissionMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -16,8 +45,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Read-your-writes deadline (see api/routes.py read_your_writes)
+    expose_headers=["X-Read-Primary-Until"],
 )
 
+# Per-route latency, status and SQL statement metrics
+app.add_middleware(MetricsMiddleware)
+install_query_hooks(engine)
+for replica_engine in replicas.engines:
+    install_query_hooks(replica_engine)
+
 # Include routers
 app.include_router(router, prefix="/api", tags=["api"])
 
@@ -29,6 +66,10 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=8000)
     
\ No newline at end of file
@@ -0,0 +1,310 @@
+"""
+In-process request and database metrics, exposed in Prometheus text format.
+
+`MetricsMiddleware` times every request and labels it with the matched route
+template (e.g. `/api/donor/{user_id}`), and `install_query_hooks` hooks
+SQLAlchemy cursor events so each request also reports how many statements it
+issued and how long they took. `render_metrics()` produces the `/metrics` body.
+
+Under gunicorn every worker keeps its own metrics, so a scrape would only see
+whichever worker answered. When METRICS_DIR is set (gunicorn.conf.py sets it),
+each worker writes a snapshot of its metrics to `<METRICS_DIR>/<pid>.json`
+every METRICS_FLUSH_INTERVAL seconds (see `start_flusher`). `render_metrics()`
+then sums counters and histograms across every worker's snapshot, including
+workers that have exited, so totals keep growing. Gauges are reported per
+worker with a `worker` label. Other workers' numbers lag by up to one flush
+interval.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from pathlib import Path
+
+import orjson
+from sqlalchemy import event
+
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250)
+
+# Per-request [statement_count, statement_seconds]; None outside a request
+_request_db_stats: ContextVar = ContextVar("request_db_stats", default=None)
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_bound(bound) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(label_values), value] for label_values, value in self._values.items()]
+
+    def render(self, snapshots=None):
+        """`snapshots`: {worker pid: snapshot} to sum; this process's values when None."""
+        totals = {}
+        for snapshot in (snapshots or {None: self.snapshot()}).values():
+            for label_values, value in snapshot:
+                key = tuple(label_values)
+                totals[key] = totals.get(key, 0.0) + value
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(totals.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *label_values):
+        with self._lock:
+            self._values[label_values] = value
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(label_values), value] for label_values, value in self._values.items()]
+
+    def render(self, snapshots=None):
+        """`snapshots`: {worker pid: snapshot}, one series per worker; this process's values when None."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        for pid, snapshot in sorted((snapshots or {0: self.snapshot()}).items()):
+            worker = f'worker="{pid}"' if snapshots else ""
+            for label_values, value in sorted(snapshot):
+                lines.append(f"{self.name}{_format_labels(self.label_names, label_values, worker)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._series = {}  # label values -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                [list(label_values), list(counts), total, count]
+                for label_values, (counts, total, count) in self._series.items()
+            ]
+
+    def render(self, snapshots=None):
+        """`snapshots`: {worker pid: snapshot} to sum; this process's values when None."""
+        merged = {}
+        for snapshot in (snapshots or {None: self.snapshot()}).values():
+            for label_values, counts, total, count in snapshot:
+                series = merged.setdefault(tuple(label_values), [[0] * len(self.buckets), 0.0, 0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+                series[2] += count
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total, count) in sorted(merged.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, label_values, f'le="{_format_bound(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route template.",
+    ("method", "route")
+)
+REQUESTS_TOTAL = Counter(
+    "http_requests_total", "Requests by route template and status code.",
+    ("method", "route", "status")
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements", "SQL statements issued per request.",
+    ("method", "route"), buckets=QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL per request.",
+    ("method", "route")
+)
+DB_STATEMENTS_TOTAL = Counter(
+    "db_statements_total", "SQL statements executed by this process."
+)
+REQUESTS_SHED_TOTAL = Counter(
+    "http_requests_shed_total", "Requests rejected with 503 by admission control, by lane.",
+    ("lane",)
+)
+SINGLEFLIGHT_CALLS_TOTAL = Counter(
+    "singleflight_calls_total", "Coalesced query calls; role is leader (ran the query), follower (shared it) or fallback (gave up waiting and ran it).",
+    ("group", "role")
+)
+SINGLEFLIGHT_COALESCING_RATIO = Gauge(
+    "singleflight_coalescing_ratio", "Share of calls served from another caller's in-flight query.",
+    ("group",)
+)
+
+REGISTRY = [
+    REQUEST_LATENCY, REQUESTS_TOTAL, REQUEST_DB_STATEMENTS, REQUEST_DB_SECONDS, DB_STATEMENTS_TOTAL,
+    REQUESTS_SHED_TOTAL, SINGLEFLIGHT_CALLS_TOTAL, SINGLEFLIGHT_COALESCING_RATIO,
+]
+
+
+def _snapshot_path(pid: int) -> Path:
+    return Path(METRICS_DIR) / f"{pid}.json"
+
+
+def flush():
+    """Write this process's metrics to METRICS_DIR (atomically, via rename)."""
+    path = _snapshot_path(os.getpid())
+    temporary = path.with_suffix(".tmp")
+    temporary.write_bytes(orjson.dumps({metric.name: metric.snapshot() for metric in REGISTRY}))
+    os.replace(temporary, path)
+
+
+def _flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        try:
+            flush()
+        except OSError:
+            pass
+
+
+def start_flusher():
+    """Start this worker's background flush thread (no-op without METRICS_DIR)."""
+    if METRICS_DIR:
+        threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+
+
+def mark_process_dead(pid: int):
+    """Keep an exited worker's counters and histograms but drop its gauges."""
+    path = _snapshot_path(pid)
+    try:
+        data = orjson.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return
+    for metric in REGISTRY:
+        if isinstance(metric, Gauge):
+            data.pop(metric.name, None)
+    path.write_bytes(orjson.dumps(data))
+
+
+def _load_snapshots() -> dict:
+    flush()
+    snapshots = {}
+    for path in Path(METRICS_DIR).glob("*.json"):
+        try:
+            snapshots[int(path.stem)] = orjson.loads(path.read_bytes())
+        except (OSError, ValueError):
+            continue  # partially written by an older version, or removed meanwhile
+    return snapshots
+
+
+def render_metrics() -> str:
+    """Prometheus text for this process, or for all workers when METRICS_DIR is set."""
+    lines = []
+    if METRICS_DIR:
+        snapshots = _load_snapshots()
+        for metric in REGISTRY:
+            lines.extend(metric.render({
+                pid: data[metric.name] for pid, data in snapshots.items() if metric.name in data
+            }))
+    else:
+        for metric in REGISTRY:
+            lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def install_query_hooks(engine):
+    """Count and time every statement executed on `engine`."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        DB_STATEMENTS_TOTAL.inc()
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    # Unmatched paths share one label so scanners can't blow up cardinality
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and DB usage per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = [0, 0.0]
+        token = _request_db_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_db_stats.reset(token)
+            method, route = scope["method"], _route_template(scope)
+            REQUEST_LATENCY.observe(elapsed, method, route)
+            REQUESTS_TOTAL.inc(method, route, str(status_code))
+            REQUEST_DB_STATEMENTS.observe(stats[0], method, route)
+            REQUEST_DB_SECONDS.observe(stats[1], method, route)
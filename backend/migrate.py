@@ -0,0 +1,23 @@
+"""
+Apply Alembic migrations from code (scripts, seeding, container start-up).
+
+Equivalent to running `alembic upgrade head` in the backend directory, but
+works from any working directory.
+"""
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = Path(__file__).resolve().parent / "alembic.ini"
+
+
+def config() -> Config:
+    alembic_config = Config(str(ALEMBIC_INI))
+    # Leave the caller's logging setup alone
+    alembic_config.attributes["configure_logging"] = False
+    return alembic_config
+
+
+def upgrade(revision: str = "head"):
+    command.upgrade(config(), revision)
@@ -0,0 +1,130 @@
+"""initial tables
+
+Tables, keys and constraints only; secondary indexes are built concurrently
+in 0002 so the same steps work on a live database.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 22:50:34.282545
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('blood_banks',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('license_number', sa.String(), nullable=True),
+    sa.Column('license_valid_till', sa.Date(), nullable=True),
+    sa.Column('state', sa.String(), nullable=True),
+    sa.Column('city', sa.String(), nullable=True),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('hospital_type', sa.String(), nullable=True),
+    sa.Column('blood_group_mask', sa.SmallInteger(), nullable=False),
+    sa.Column('units_available', sa.Integer(), nullable=False),
+    sa.Column('freshness_days', sa.Integer(), nullable=True),
+    sa.Column('emergency_support', sa.Boolean(), nullable=True),
+    sa.Column('rating', sa.Float(), nullable=True),
+    sa.Column('avg_response_time_min', sa.Integer(), nullable=True),
+    sa.Column('is_govt', sa.Boolean(), nullable=True),
+    sa.Column('contact', sa.String(), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('revoked_tokens',
+    sa.Column('jti', sa.String(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('expires_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('revoked_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('password_hash', sa.String(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('profiles',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_type', sa.String(), nullable=False),
+    sa.Column('first_name', sa.String(), nullable=False),
+    sa.Column('last_name', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('address', sa.Text(), nullable=True),
+    sa.Column('city', sa.String(), nullable=True),
+    sa.Column('state', sa.String(), nullable=True),
+    sa.Column('country', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('donors',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('age', sa.Integer(), nullable=True),
+    sa.Column('gender', sa.String(), nullable=True),
+    sa.Column('blood_type', sa.String(), nullable=True),
+    sa.Column('last_donation_date', sa.Date(), nullable=True),
+    sa.Column('total_donations', sa.Integer(), nullable=True),
+    sa.Column('available', sa.Boolean(), nullable=True),
+    sa.Column('contact_preference', sa.String(), nullable=True),
+    sa.Column('emergency_contact', sa.Boolean(), nullable=True),
+    sa.Column('health_conditions', sa.ARRAY(sa.Text()), nullable=True),
+    sa.ForeignKeyConstraint(['id'], ['profiles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('hospitals',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('hospital_name', sa.String(), nullable=False),
+    sa.Column('services', sa.ARRAY(sa.Text()), nullable=True),
+    sa.Column('thalassemia_specialist', sa.Boolean(), nullable=True),
+    sa.Column('rating', sa.DECIMAL(precision=3, scale=2), nullable=True),
+    sa.Column('total_ratings', sa.Integer(), nullable=True),
+    sa.Column('emergency_contact', sa.String(), nullable=True),
+    sa.Column('website', sa.String(), nullable=True),
+    sa.Column('insurance_accepted', sa.ARRAY(sa.Text()), nullable=True),
+    sa.ForeignKeyConstraint(['id'], ['profiles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('patients',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('age', sa.Integer(), nullable=True),
+    sa.Column('gender', sa.String(), nullable=True),
+    sa.Column('blood_type', sa.String(), nullable=True),
+    sa.Column('thalassemia_type', sa.String(), nullable=True),
+    sa.Column('severity_level', sa.String(), nullable=True),
+    sa.Column('diagnosis_date', sa.Date(), nullable=True),
+    sa.Column('current_requirements', sa.Text(), nullable=True),
+    sa.Column('emergency_contact_name', sa.String(), nullable=True),
+    sa.Column('emergency_contact_phone', sa.String(), nullable=True),
+    sa.Column('insurance_provider', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['id'], ['profiles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('patients')
+    op.drop_table('hospitals')
+    op.drop_table('donors')
+    op.drop_table('profiles')
+    op.drop_table('users')
+    op.drop_table('revoked_tokens')
+    op.drop_table('blood_banks')
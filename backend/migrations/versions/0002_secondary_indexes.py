@@ -0,0 +1,80 @@
+"""secondary indexes
+
+Every secondary index declared in models.py, built with CREATE INDEX
+CONCURRENTLY so tables stay writable while they build. CONCURRENTLY cannot
+run inside a transaction, so each statement runs in an autocommit block.
+IF NOT EXISTS makes the step safe to re-run and lets databases created by
+the old create_all script (which already had some of these) be stamped at
+0001 and upgraded. A concurrent build that fails leaves an INVALID index
+behind; those are dropped first so a retry rebuilds them.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 22:58:12.104930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, extra create_index kwargs)
+INDEXES = [
+    ('idx_users_email_lower', 'users', [sa.text('lower(email)')],
+     {'unique': True, 'postgresql_include': ['id', 'email', 'password_hash']}),
+    ('idx_revoked_tokens_expires_at', 'revoked_tokens', ['expires_at'], {}),
+    ('idx_profiles_user_type', 'profiles', ['user_type'], {}),
+    ('idx_profiles_city_state', 'profiles', ['city', 'state'], {}),
+    ('idx_patients_blood_type', 'patients', ['blood_type'], {}),
+    ('idx_patients_thalassemia_type', 'patients', ['thalassemia_type'], {}),
+    ('idx_patients_severity', 'patients', ['severity_level'], {}),
+    ('idx_donors_blood_type', 'donors', ['blood_type'], {}),
+    ('idx_donors_available', 'donors', ['available'], {}),
+    ('idx_donors_last_donation', 'donors', ['last_donation_date'], {}),
+    ('idx_donors_eligible', 'donors',
+     ['blood_type', sa.text("coalesce(last_donation_date, '-infinity'::date)")],
+     {'postgresql_where': sa.text('available = true')}),
+    ('idx_hospitals_thalassemia_specialist', 'hospitals', ['thalassemia_specialist'], {}),
+    ('idx_hospitals_rating', 'hospitals', ['rating'], {}),
+    ('idx_hospitals_services', 'hospitals', ['services'], {'postgresql_using': 'gin'}),
+    ('idx_blood_banks_lat_lon', 'blood_banks', ['latitude', 'longitude'], {}),
+    ('idx_blood_banks_updated_at', 'blood_banks', ['updated_at'], {}),
+]
+
+
+def _invalid_indexes() -> set:
+    if op.get_context().as_sql:  # offline --sql mode has no database to ask
+        return set()
+    rows = op.get_bind().execute(sa.text(
+        "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE NOT i.indisvalid"
+    ))
+    return {name for name, in rows}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        invalid = _invalid_indexes()
+        for name, table, columns, kwargs in INDEXES:
+            if name in invalid:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True, if_not_exists=True, **kwargs,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
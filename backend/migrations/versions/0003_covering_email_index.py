@@ -0,0 +1,58 @@
+"""covering email index
+
+Brings databases created before 0001/0002 gained these changes (including
+ones made by the old create_all script) in line with them:
+idx_users_email_lower becomes a covering index (INCLUDE id, email,
+password_hash) so login is an index-only scan, and the now-redundant
+users_email_key unique constraint is dropped. The index is rebuilt
+concurrently under a temporary name and swapped in. On a database created
+from 0001 both steps are no-ops.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 23:10:41.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INCLUDE = ['id', 'email', 'password_hash']
+
+
+def _email_index_covers() -> bool:
+    if op.get_context().as_sql:  # offline --sql mode: emit the rebuild
+        return False
+    covers = op.get_bind().execute(sa.text(
+        "SELECT i.indnatts > i.indnkeyatts FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = 'idx_users_email_lower' AND i.indisvalid"
+    )).scalar()
+    return bool(covers)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        if not _email_index_covers():
+            op.drop_index('idx_users_email_lower_new', table_name='users', postgresql_concurrently=True, if_exists=True)
+            op.create_index(
+                'idx_users_email_lower_new', 'users', [sa.text('lower(email)')], unique=True,
+                postgresql_include=INCLUDE, postgresql_concurrently=True,
+            )
+            op.drop_index('idx_users_email_lower', table_name='users', postgresql_concurrently=True, if_exists=True)
+            op.execute('ALTER INDEX idx_users_email_lower_new RENAME TO idx_users_email_lower')
+    op.execute('ALTER TABLE users DROP CONSTRAINT IF EXISTS users_email_key')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_unique_constraint('users_email_key', 'users', ['email'])
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, Date, ForeignKey, Text, ARRAY, DECIMAL, TIMESTAMP
+from sqlalchemy import Column, String, Integer, SmallInteger, Boolean, Date, Float, ForeignKey, Text, ARRAY, DECIMAL, TIMESTAMP, Index, literal_column
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -7,11 +7,31 @@ from database import Base
 class User(Base):
     __tablename__ = "users"
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    email = Column(String, unique=True, nullable=False)
+    email = Column(String, nullable=False)  # unique through idx_users_email_lower
     password_hash = Column(String, nullable=False)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
 
+# Emails are matched case-insensitively (login, duplicate checks on registration).
+# The login columns are included so the lookup can be an index-only scan.
+Index(
+    "idx_users_email_lower", func.lower(User.email), unique=True,
+    postgresql_include=["id", "email", "password_hash"]
+)
+
+
+class RevokedToken(Base):
+    """Session tokens revoked before expiry (logout); rows can be purged after expires_at."""
+    __tablename__ = "revoked_tokens"
+    jti = Column(String, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    revoked_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    __table_args__ = (
+        # Purging rows whose tokens have expired
+        Index("idx_revoked_tokens_expires_at", "expires_at"),
+    )
+
 
 class Profile(Base):
     __tablename__ = "profiles"  
@@ -27,6 +47,10 @@ class Profile(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+    __table_args__ = (
+        Index("idx_profiles_user_type", "user_type"),
+        Index("idx_profiles_city_state", "city", "state"),
+    )
 
 
 class Patient(Base):
@@ -42,6 +66,11 @@ class Patient(Base):
     emergency_contact_name = Column(String)
     emergency_contact_phone = Column(String)
     insurance_provider = Column(String)
+    __table_args__ = (
+        Index("idx_patients_blood_type", "blood_type"),
+        Index("idx_patients_thalassemia_type", "thalassemia_type"),
+        Index("idx_patients_severity", "severity_level"),
+    )
 
 
 class Donor(Base):
@@ -56,6 +85,23 @@ class Donor(Base):
     contact_preference = Column(String, default="email")
     emergency_contact = Column(Boolean, default=False)
     health_conditions = Column(ARRAY(Text))
+    __table_args__ = (
+        Index("idx_donors_blood_type", "blood_type"),
+        Index("idx_donors_available", "available"),
+        Index("idx_donors_last_donation", "last_donation_date"),
+    )
+
+
+# Donors who never donated sort first, so "eligible as of a date" is a single
+# range on (blood_type, coalesce(last_donation_date, '-infinity')).
+donor_last_donation_key = func.coalesce(Donor.last_donation_date, literal_column("'-infinity'::date"))
+
+Index(
+    "idx_donors_eligible",
+    Donor.blood_type,
+    donor_last_donation_key,
+    postgresql_where=Donor.available == True,
+)
 
 
 class Hospital(Base):
@@ -69,3 +115,36 @@ class Hospital(Base):
     emergency_contact = Column(String)
     website = Column(String)
     insurance_accepted = Column(ARRAY(Text))
+    __table_args__ = (
+        Index("idx_hospitals_thalassemia_specialist", "thalassemia_specialist"),
+        Index("idx_hospitals_rating", "rating"),
+        Index("idx_hospitals_services", "services", postgresql_using="gin"),
+    )
+
+
+class BloodBank(Base):
+    __tablename__ = "blood_banks"
+    id = Column(String, primary_key=True)  # BloodBank_ID from the source dataset, e.g. BB0001
+    name = Column(String, nullable=False)
+    license_number = Column(String)
+    license_valid_till = Column(Date)
+    state = Column(String)
+    city = Column(String)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    hospital_type = Column(String)
+    blood_group_mask = Column(SmallInteger, nullable=False, default=0)  # bit i = crud.BLOOD_TYPES[i]
+    units_available = Column(Integer, nullable=False, default=0)
+    freshness_days = Column(Integer)
+    emergency_support = Column(Boolean, default=False)
+    rating = Column(Float)
+    avg_response_time_min = Column(Integer)
+    is_govt = Column(Boolean, default=False)
+    contact = Column(String)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+    __table_args__ = (
+        # Radius searches start with a latitude band, then check longitude in the index
+        Index("idx_blood_banks_lat_lon", "latitude", "longitude"),
+        # Incremental snapshot refreshes select rows changed since a watermark
+        Index("idx_blood_banks_updated_at", "updated_at"),
+    )
@@ -0,0 +1,153 @@
+"""
+Password hashing with scrypt, run in a bounded process pool.
+
+Hashes are stored as `scrypt$<n>$<r>$<p>$<salt>$<key>` (base64 salt and key).
+The cost is set by PASSWORD_SCRYPT_N / _R / _P. Hashes made with other
+parameters, and legacy unsalted SHA-256 hex digests, still verify, and
+`verify_password` reports them as needing a rehash so login can upgrade
+them in place.
+
+scrypt is deliberately CPU- and memory-heavy, so derivation runs in a pool
+of PASSWORD_HASH_WORKERS processes (default: one per core) instead of on
+request threads. Login throughput then scales with cores and the threads
+serving other routes are never stuck behind the GIL. Set
+PASSWORD_HASH_WORKERS=0 to hash inline (scripts, single-core containers).
+The `*_async` variants await the pool from the event loop instead of parking
+a thread on the result, which is what the async login route uses.
+
+Verifying against `None` (an unknown email) checks a dummy hash of the same
+cost, so a login for an unregistered address takes as long as a wrong
+password and response times don't reveal which emails exist.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _derive(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * r * (n + p), dklen=KEY_BYTES,
+    )
+
+
+def _get_pool():
+    """Process pool created on first use, so each server worker gets its own."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: forking a process that already runs threads is unsafe
+                _pool = ProcessPoolExecutor(HASH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def _run(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    if HASH_WORKERS <= 0:
+        return _derive(password, salt, n, r, p)
+    return _get_pool().submit(_derive, password, salt, n, r, p).result()
+
+
+async def _run_async(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # Inline mode still has to keep the event loop free, so use the default thread executor
+    executor = _get_pool() if HASH_WORKERS > 0 else None
+    return await asyncio.get_running_loop().run_in_executor(executor, _derive, password, salt, n, r, p)
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def _format(salt: bytes, key: bytes) -> str:
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64encode(salt)}${_b64encode(key)}"
+
+
+# Never matches (no password derives an all-zero key), but costs a real derivation
+DUMMY_HASH = _format(secrets.token_bytes(SALT_BYTES), bytes(KEY_BYTES))
+
+
+def hash_password(password: str) -> str:
+    """scrypt hash of a password with a fresh salt and the configured cost."""
+    salt = secrets.token_bytes(SALT_BYTES)
+    return _format(salt, _run(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P))
+
+
+async def hash_password_async(password: str) -> str:
+    salt = secrets.token_bytes(SALT_BYTES)
+    return _format(salt, await _run_async(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P))
+
+
+def _parse(stored_hash: str):
+    """(n, r, p, salt, key) of a scrypt hash, or None if it is malformed."""
+    try:
+        _, n, r, p, salt, key = stored_hash.split("$")
+        return int(n), int(r), int(p), base64.b64decode(salt), base64.b64decode(key)
+    except ValueError:
+        return None
+
+
+def _verify_legacy(password: str, stored_hash: str) -> tuple:
+    legacy = hashlib.sha256(password.encode()).hexdigest()
+    matches = hmac.compare_digest(legacy, stored_hash)
+    return matches, matches
+
+
+def _result(derived: bytes, n: int, r: int, p: int, key: bytes, known: bool) -> tuple:
+    matches = hmac.compare_digest(derived, key) and known
+    return matches, matches and (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+def verify_password(password: str, stored_hash: str = None) -> tuple:
+    """
+    Returns (matches, needs_rehash).
+
+    needs_rehash is True for a matching legacy SHA-256 hash or a scrypt hash
+    made with a different cost than the current settings. A `stored_hash` of
+    None (no such user) is checked against DUMMY_HASH and never matches.
+    """
+    known = stored_hash is not None
+    stored_hash = stored_hash if known else DUMMY_HASH
+    if not stored_hash.startswith("scrypt$"):
+        return _verify_legacy(password, stored_hash)
+    parsed = _parse(stored_hash)
+    if parsed is None:
+        return False, False
+    n, r, p, salt, key = parsed
+    return _result(_run(password, salt, n, r, p), n, r, p, key, known)
+
+
+async def verify_password_async(password: str, stored_hash: str = None) -> tuple:
+    """`verify_password` without holding a thread while the pool derives the key."""
+    known = stored_hash is not None
+    stored_hash = stored_hash if known else DUMMY_HASH
+    if not stored_hash.startswith("scrypt$"):
+        return _verify_legacy(password, stored_hash)
+    parsed = _parse(stored_hash)
+    if parsed is None:
+        return False, False
+    n, r, p, salt, key = parsed
+    return _result(await _run_async(password, salt, n, r, p), n, r, p, key, known)
@@ -0,0 +1,63 @@
+"""
+Statement counting for N+1 regression checks.
+
+`QueryCounter` listens to SQLAlchemy's `before_cursor_execute` event on an
+engine (by default the primary and every read replica) and records every
+statement issued while it is active, including the ones a route runs on the
+threadpool. `assert_max_queries` wraps it with a
+ceiling:
+
+    with assert_max_queries(3):
+        client.get("/api/donors/available?blood_type=O+")
+
+Exceeding the ceiling raises `QueryBudgetExceeded` listing the statements, so
+a per-row `crud.get_*` lookup sneaking back into a route fails loudly.
+"""
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from database import engine as default_engine, replicas
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    def __init__(self, engine=None):
+        self.engines = [engine] if engine else [default_engine, *replicas.engines]
+        self.statements = []
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.statements.append(statement)
+
+    def __enter__(self):
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        return False
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, engine=None, label: str = ""):
+    """Fail if more than `max_queries` statements run inside the block."""
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count > max_queries:
+        listing = "\n".join(f"  {i + 1}. {sql.strip()}" for i, sql in enumerate(counter.statements))
+        prefix = f"{label}: " if label else ""
+        raise QueryBudgetExceeded(
+            f"{prefix}{counter.count} statements issued, budget is {max_queries}\n{listing}"
+        )
@@ -0,0 +1,143 @@
+"""
+Serve-time feature pipeline for the blood request ranker (ranker_api_aligned.pkl).
+
+Mirrors the derived features built in mlmodel.ipynb, but computes
+`Distance_km` live from the requester's `User_Latitude`/`User_Longitude`
+instead of reading the dataset's static column, so `Inv_Distance`,
+`Rel_Distance` and `Urgency_x_Distance` follow the requester. Every feature is
+a NumPy column over all candidates; several requests can be scored in one
+batch by passing a `request_index` per candidate.
+
+`load_artifacts` reads the model and encoders saved by the notebook. joblib,
+and the lightgbm/sklearn modules the pickles need, are only imported there,
+so importing this module stays cheap.
+"""
+import os
+
+import numpy as np
+
+from distance import distances_km
+
+FEATURES = [
+    "Distance_km",
+    "Available_Units_For_Type",
+    "Meets_Demand_Bool",
+    "Last_Updated_Min_Ago",
+    "Units_Requested",
+    "Blood_Group_Requested",
+    "Urgency_Level",
+    "City",
+    "Availability_Ratio",
+    "Staleness_Score",
+    "Rel_Availability",
+    "Rel_Distance",
+    "Inv_Distance",
+    "Urgency_Num",
+    "Urgency_x_Distance",
+]
+CATEGORICAL_FEATURES = ["Blood_Group_Requested", "Urgency_Level", "City"]
+URGENCY_NUM = {"Emergency": 2, "Routine": 1, "Scheduled": 0}
+MODEL_FILE = "ranker_api_aligned.pkl"
+
+_artifacts = {}
+
+
+def _group_reduce(ufunc, values: np.ndarray, groups: np.ndarray, groups_count: int, initial: float) -> np.ndarray:
+    out = np.full(groups_count, initial, dtype=np.float64)
+    ufunc.at(out, groups, values)
+    return out
+
+
+def ranker_features(requests: dict, candidates: dict, request_index=None, road_factors: dict = None) -> dict:
+    """Feature columns for every candidate.
+
+    `requests` maps User_Latitude, User_Longitude, Units_Requested,
+    Blood_Group_Requested and Urgency_Level to scalars (one request) or arrays
+    (one entry per request). `candidates` maps Latitude, Longitude, City,
+    Available_Units_For_Type and Last_Updated_Min_Ago to arrays; `request_index`
+    says which request each candidate belongs to (all zeros when omitted).
+    """
+    available = np.asarray(candidates["Available_Units_For_Type"], dtype=np.float64)
+    n = len(available)
+    if request_index is None:
+        request_index = np.zeros(n, dtype=np.intp)
+    request_index = np.asarray(request_index, dtype=np.intp)
+    per_request = {key: np.atleast_1d(np.asarray(value))[request_index] for key, value in requests.items()}
+    groups_count = int(request_index.max()) + 1 if n else 0
+
+    distance = distances_km(
+        per_request["User_Latitude"].astype(np.float64),
+        per_request["User_Longitude"].astype(np.float64),
+        candidates["Latitude"], candidates["Longitude"],
+        cities=candidates.get("City"), road_factors=road_factors,
+    )
+    units_requested = per_request["Units_Requested"].astype(np.float64)
+    last_updated = np.asarray(candidates["Last_Updated_Min_Ago"], dtype=np.float64)
+    urgency_num = np.array([URGENCY_NUM.get(u, 1) for u in per_request["Urgency_Level"]], dtype=np.int64)
+
+    min_distance = _group_reduce(np.minimum, distance, request_index, groups_count, np.inf)
+    available_sum = _group_reduce(np.add, available, request_index, groups_count, 0.0)
+    available_mean = available_sum / np.maximum(np.bincount(request_index, minlength=groups_count), 1)
+
+    return {
+        "Distance_km": distance,
+        "Available_Units_For_Type": available,
+        "Meets_Demand_Bool": available >= units_requested,
+        "Last_Updated_Min_Ago": last_updated,
+        "Units_Requested": units_requested,
+        "Blood_Group_Requested": per_request["Blood_Group_Requested"],
+        "Urgency_Level": per_request["Urgency_Level"],
+        "City": np.asarray(candidates.get("City", [""] * n), dtype=object),
+        "Availability_Ratio": available / np.maximum(units_requested, 1),
+        "Staleness_Score": 1.0 / (1.0 + last_updated),
+        "Rel_Availability": available / np.maximum(available_mean[request_index], 1e-6),
+        "Rel_Distance": distance / (min_distance[request_index] + 1e-6),
+        "Inv_Distance": 1.0 / (1.0 + distance),
+        "Urgency_Num": urgency_num,
+        "Urgency_x_Distance": urgency_num * distance,
+    }
+
+
+def encode_labels(values, classes) -> np.ndarray:
+    """LabelEncoder.transform equivalent; labels unseen in training become -1."""
+    classes = np.asarray(classes).astype(str)
+    values = np.asarray(values, dtype=object).astype(str)
+    codes = np.searchsorted(classes, values)
+    codes = np.minimum(codes, len(classes) - 1)
+    return np.where(classes[codes] == values, codes, -1)
+
+
+def feature_matrix(features: dict, encoders: dict) -> np.ndarray:
+    """Stack features in FEATURES order, label-encoding categorical columns.
+
+    `encoders` maps each CATEGORICAL_FEATURES column to its fitted
+    LabelEncoder (the enc_<column>.pkl files saved next to the model).
+    """
+    columns = []
+    for name in FEATURES:
+        column = features[name]
+        if name in CATEGORICAL_FEATURES:
+            column = encode_labels(column, encoders[name].classes_)
+        columns.append(np.asarray(column, dtype=np.float64))
+    return np.column_stack(columns)
+
+
+def load_artifacts(model_dir: str, num_threads: int = None):
+    """(model, encoders) from `model_dir`, loaded once per process.
+
+    `num_threads` caps LightGBM's prediction threads (its n_jobs); by
+    default it follows OMP_NUM_THREADS.
+    """
+    if model_dir not in _artifacts:
+        import joblib  # unpickling imports lightgbm and sklearn
+
+        model = joblib.load(os.path.join(model_dir, MODEL_FILE))
+        num_threads = num_threads or int(os.getenv("OMP_NUM_THREADS", "0"))
+        if num_threads:
+            model.set_params(n_jobs=num_threads)
+        encoders = {
+            column: joblib.load(os.path.join(model_dir, f"enc_{column}.pkl"))
+            for column in CATEGORICAL_FEATURES
+        }
+        _artifacts[model_dir] = (model, encoders)
+    return _artifacts[model_dir]
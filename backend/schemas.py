@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from typing import Optional, List
-from datetime import date
+from datetime import date, datetime
+import uuid
 
 # Authentication schemas
 class LoginRequest(BaseModel):
@@ -8,9 +9,13 @@ class LoginRequest(BaseModel):
     password: str
 
 class TokenResponse(BaseModel):
+    message: str = "Login successful"
     access_token: str
-    token_type: str
+    token_type: str = "bearer"
+    expires_in: int
     user_id: str
+    email: str
+    user_type: Optional[str] = None
 
 # User creation
 class UserCreate(BaseModel):
@@ -113,30 +118,164 @@ class HospitalRegistration(HospitalProfile, UserCreate):
     pass
 
 # Response schemas
+# Read straight off ORM rows (from_attributes) so routes can return SQLAlchemy
+# objects and skip jsonable_encoder's per-attribute reflection.
 class ProfileResponse(BaseModel):
-    id: str
-    email: str
+    id: uuid.UUID
     user_type: str
     first_name: str
     last_name: str
-    phone: Optional[str]
-    address: Optional[str]
-    city: Optional[str]
-    state: Optional[str]
-    country: str
-    is_active: bool
-    created_at: str
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    country: Optional[str] = None
+    is_active: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    model_config = {"from_attributes": True}
 
-    class Config:
-        from_attributes = True
+# List and discovery routes: no phone/address, no donor health data. Full
+# details come from the authenticated per-user routes.
+class PublicProfileResponse(BaseModel):
+    id: uuid.UUID
+    user_type: str
+    first_name: str
+    last_name: str
+    city: Optional[str] = None
+    state: Optional[str] = None
+    country: Optional[str] = None
+    is_active: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    model_config = {"from_attributes": True}
 
 class UserResponse(BaseModel):
-    id: str
+    id: uuid.UUID
     email: str
-    created_at: str
+    created_at: Optional[datetime] = None
+    model_config = {"from_attributes": True}
+
+class PatientResponse(BaseModel):
+    id: uuid.UUID
+    age: Optional[int] = None
+    gender: Optional[str] = None
+    blood_type: Optional[str] = None
+    thalassemia_type: Optional[str] = None
+    severity_level: Optional[str] = None
+    diagnosis_date: Optional[date] = None
+    current_requirements: Optional[str] = None
+    emergency_contact_name: Optional[str] = None
+    emergency_contact_phone: Optional[str] = None
+    insurance_provider: Optional[str] = None
+    model_config = {"from_attributes": True}
+
+class DonorResponse(BaseModel):
+    id: uuid.UUID
+    age: Optional[int] = None
+    gender: Optional[str] = None
+    blood_type: Optional[str] = None
+    last_donation_date: Optional[date] = None
+    total_donations: Optional[int] = None
+    available: Optional[bool] = None
+    contact_preference: Optional[str] = None
+    emergency_contact: Optional[bool] = None
+    health_conditions: Optional[List[str]] = None
+    model_config = {"from_attributes": True}
+
+class PublicDonorResponse(BaseModel):
+    id: uuid.UUID
+    blood_type: Optional[str] = None
+    last_donation_date: Optional[date] = None
+    total_donations: Optional[int] = None
+    available: Optional[bool] = None
+    contact_preference: Optional[str] = None
+    emergency_contact: Optional[bool] = None
+    model_config = {"from_attributes": True}
+
+class HospitalResponse(BaseModel):
+    id: uuid.UUID
+    hospital_name: str
+    services: Optional[List[str]] = None
+    thalassemia_specialist: Optional[bool] = None
+    rating: Optional[float] = None
+    total_ratings: Optional[int] = None
+    emergency_contact: Optional[str] = None
+    website: Optional[str] = None
+    insurance_accepted: Optional[List[str]] = None
+    model_config = {"from_attributes": True}
+
+class DonorEntry(BaseModel):
+    profile: PublicProfileResponse
+    donor_data: PublicDonorResponse
+
+class HospitalEntry(BaseModel):
+    profile: PublicProfileResponse
+    hospital_data: HospitalResponse
+
+class DonorListResponse(BaseModel):
+    donors: List[DonorEntry]
+    count: int
 
-    class Config:
-        from_attributes = True
+class HospitalListResponse(BaseModel):
+    hospitals: List[HospitalEntry]
+    count: int
+
+class ProfileListResponse(BaseModel):
+    profiles: List[PublicProfileResponse]
+    count: int
+
+class PatientResourcesResponse(BaseModel):
+    matched_donors: List[DonorEntry]
+    specialist_hospitals: List[HospitalEntry]
+
+class CompleteProfileResponse(BaseModel):
+    profile: ProfileResponse
+    patient_data: Optional[PatientResponse] = None
+    donor_data: Optional[DonorResponse] = None
+    hospital_data: Optional[HospitalResponse] = None
+
+class StatsResponse(BaseModel):
+    patient_count: int
+    donor_count: int
+    hospital_count: int
+
+class LocationFilter(BaseModel):
+    city: Optional[str] = None
+    state: Optional[str] = None
+
+class DetailedStatsResponse(StatsResponse):
+    filtered_by_location: Optional[StatsResponse] = None
+    location_filter: Optional[LocationFilter] = None
+    available_donors_count: int
+    thalassemia_specialist_hospitals_count: int
+
+# Blood bank inventory schemas
+class BloodBankResponse(BaseModel):
+    id: str
+    name: str
+    license_number: Optional[str] = None
+    license_valid_till: Optional[date] = None
+    state: Optional[str] = None
+    city: Optional[str] = None
+    latitude: float
+    longitude: float
+    hospital_type: Optional[str] = None
+    blood_groups: List[str] = []
+    units_available: int
+    freshness_days: Optional[int] = None
+    emergency_support: bool
+    rating: Optional[float] = None
+    avg_response_time_min: Optional[int] = None
+    is_govt: bool
+    contact: Optional[str] = None
+    distance_km: float
+
+    model_config = {"from_attributes": True}
+
+class InventorySearchResponse(BaseModel):
+    banks: List[BloodBankResponse]
+    count: int
 
 # Search schemas
 class SearchRequest(BaseModel):
@@ -146,5 +285,64 @@ class SearchRequest(BaseModel):
     state: Optional[str] = None
     thalassemia_specialist: Optional[bool] = None
     available: Optional[bool] = None
+    eligible_only: bool = False
     limit: int = 50
     offset: int = 0
+
+# Bulk update schemas
+class DonorDriveFields(BaseModel):
+    """What a donation drive changes; medical and identity fields stay donor-owned."""
+    available: Optional[bool] = None
+    last_donation_date: Optional[date] = None
+    total_donations: Optional[int] = Field(default=None, ge=0)
+
+    model_config = {"extra": "forbid"}
+
+    @model_validator(mode="after")
+    def reject_nulls(self):
+        # Omit a field to leave it unchanged; null would overwrite it with NULL
+        nulls = [name for name in self.model_fields_set if getattr(self, name) is None]
+        if nulls:
+            raise ValueError(f"Fields cannot be null: {', '.join(sorted(nulls))}")
+        return self
+
+class DonorBulkItem(BaseModel):
+    id: uuid.UUID
+    fields: DonorDriveFields
+
+class DonorBulkFilter(BaseModel):
+    blood_type: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    available: Optional[bool] = None
+
+    model_config = {"extra": "forbid"}
+
+class DonorBulkUpdate(BaseModel):
+    """Either `updates` (per-donor fields) or `filter` plus `patch`."""
+    updates: Optional[List[DonorBulkItem]] = Field(default=None, max_length=5000)
+    filter: Optional[DonorBulkFilter] = None
+    patch: Optional[DonorDriveFields] = None
+
+    @model_validator(mode="after")
+    def check_mode(self):
+        if (self.updates is None) == (self.filter is None):
+            raise ValueError("Provide either 'updates' or 'filter' with 'patch'")
+        if self.filter is not None:
+            if self.patch is None or not self.patch.model_fields_set:
+                raise ValueError("'filter' requires a non-empty 'patch'")
+            # `available` alone would match most of the donor pool
+            if not (self.filter.blood_type or self.filter.city or self.filter.state):
+                raise ValueError("'filter' needs a blood_type, city or state condition")
+        elif self.patch is not None:
+            raise ValueError("'patch' is only used with 'filter'")
+        return self
+
+class DonorBulkResult(BaseModel):
+    id: uuid.UUID
+    status: str  # "updated" | "not_found"
+
+class DonorBulkResponse(BaseModel):
+    updated: int
+    not_found: int
+    results: List[DonorBulkResult]
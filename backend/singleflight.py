@@ -0,0 +1,74 @@
+"""
+Request coalescing for identical concurrent queries ("singleflight").
+
+The first caller for a key runs the query; callers arriving with the same key
+while it is in flight wait for it and share its result (or exception) instead
+of running the same query again. Nothing is cached once the flight lands.
+
+Followers wait at most `wait_timeout` seconds. If the leader is still running
+by then (a slow or hung query), each follower runs the query itself rather
+than holding its thread indefinitely; these show up as the `fallback` role in
+`singleflight_calls_total`.
+
+Results are shared between threads, so callers should return plain data or
+validated response models rather than session-bound ORM objects.
+"""
+import threading
+
+from metrics import SINGLEFLIGHT_CALLS_TOTAL, SINGLEFLIGHT_COALESCING_RATIO
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, group: str, wait_timeout: float = None):
+        self.group = group
+        self.wait_timeout = wait_timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._followers = 0
+
+    def _record(self, leader: bool):
+        # Called with self._lock held
+        if leader:
+            self._leaders += 1
+        else:
+            self._followers += 1
+        SINGLEFLIGHT_CALLS_TOTAL.inc(self.group, "leader" if leader else "follower")
+        SINGLEFLIGHT_COALESCING_RATIO.set(self._followers / (self._leaders + self._followers), self.group)
+
+    def do(self, key, fn):
+        """Return fn() for `key`, sharing one execution among concurrent callers."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._record(leader)
+
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                SINGLEFLIGHT_CALLS_TOTAL.inc(self.group, "fallback")
+                return fn()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
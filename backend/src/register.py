@@ -1,11 +1,31 @@
-from utils.supabase_client import get_Supabase
-from fastapi import FastAPI, HTTPException, Depends
+from utils.supabase_client import get_async_Supabase, get_auth_client, create_http_client
+from fastapi import FastAPI, HTTPException, Depends, Request
 from pydantic import BaseModel, Field
 from typing import Optional, List
+from contextlib import asynccontextmanager
+from supabase import AsyncClient
+from supabase_auth import AsyncGoTrueClient
+import asyncio
 import uuid
 from datetime import datetime
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled transport and one service-role client for the whole process
+    app.state.http_client = create_http_client()
+    app.state.supabase = await get_async_Supabase(app.state.http_client)
+    try:
+        yield
+    finally:
+        await app.state.http_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+def get_supabase(request: Request) -> AsyncClient:
+    return request.app.state.supabase
+
+def get_auth(request: Request) -> AsyncGoTrueClient:
+    return get_auth_client(request.app.state.http_client)
 
 class LoginRequest(BaseModel):
     email: str
@@ -57,20 +77,20 @@ class SearchRequest(BaseModel):
     state: Optional[str] = None
     thalassemia_specialist: Optional[bool] = None
     available: Optional[bool] = None
+    limit: int = Field(default=50, ge=1, le=1000)
+    offset: int = Field(default=0, ge=0)
     model_config = {"extra": "ignore"}
 
 @app.post("/login")
-def login(request: LoginRequest):
-    supabase = get_Supabase()
-    
+async def login(request: LoginRequest, supabase: AsyncClient = Depends(get_supabase), auth: AsyncGoTrueClient = Depends(get_auth)):
     try:
-        result = supabase.auth.sign_in_with_password({
+        result = await auth.sign_in_with_password({
             "email": request.email,
             "password": request.password
         })
         
         # Get user profile
-        profile = supabase.table('profiles').select('*').eq('id', result.user.id).single().execute()
+        profile = await supabase.table('profiles').select('*').eq('id', result.user.id).single().execute()
         
         return {
             "message": "Login successful",
@@ -82,20 +102,18 @@ def login(request: LoginRequest):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
 @app.post("/signup")
-def signup(request: SignupRequest):
-    supabase = get_Supabase()
-    
+async def signup(request: SignupRequest, supabase: AsyncClient = Depends(get_supabase), auth: AsyncGoTrueClient = Depends(get_auth)):
     try:
         # Sign up with Supabase Auth
-        result = supabase.auth.sign_up({
+        result = await auth.sign_up({
             "email": request.email,
             "password": request.password
         })
         
         if result.user:
-            # Create profile in profiles table
+            # Profile and role rows are inserted in one transaction by the
+            # create_user_profile function (simplified_schema.sql)
             profile_data = {
-                "id": result.user.id,
                 "user_type": request.user_type,
                 "first_name": request.first_name or "",
                 "last_name": request.last_name or "",
@@ -105,71 +123,48 @@ def signup(request: SignupRequest):
                 "city": request.city,
                 "state": request.state
             }
-            
-            supabase.table('profiles').insert(profile_data).execute()
-            
-            # Create specific profile based on user type
+            role_data = {}
+            if request.user_type in ("patient", "donor"):
+                role_data["blood_type"] = request.blood_type
             if request.user_type == "patient":
-                patient_data = {
-                    "id": result.user.id,
-                    "blood_type": request.blood_type,
-                    "thalassemia_type": request.thalassemia_type,
-                    "severity_level": request.severity_level
-                }
-                supabase.table('patients').insert(patient_data).execute()
-                
+                role_data["thalassemia_type"] = request.thalassemia_type
+                role_data["severity_level"] = request.severity_level
             elif request.user_type == "donor":
-                donor_data = {
-                    "id": result.user.id,
-                    "blood_type": request.blood_type,
-                    "last_donation_date": request.last_donation,
-                    "contact_preference": request.contact_preference or "email"
-                }
-                supabase.table('donors').insert(donor_data).execute()
-                
+                role_data["last_donation_date"] = request.last_donation
+                role_data["contact_preference"] = request.contact_preference or "email"
             elif request.user_type == "hospital":
-                hospital_data = {
-                    "id": result.user.id,
-                    "hospital_name": request.name,
-                    "services": request.services.split(',') if request.services else [],
-                    "thalassemia_specialist": request.thalassemia_specialist or False
-                }
-                supabase.table('hospitals').insert(hospital_data).execute()
-                
-            elif request.user_type == "doctor":
-                doctor_data = {
-                    "id": result.user.id,
-                    "specialization": "General Medicine",  # Default, can be updated later
-                    "thalassemia_specialist": False  # Default, can be updated later
-                }
-                supabase.table('doctors').insert(doctor_data).execute()
+                role_data["hospital_name"] = request.name
+                role_data["services"] = request.services.split(',') if request.services else []
+                role_data["thalassemia_specialist"] = request.thalassemia_specialist or False
+
+            await supabase.rpc('create_user_profile', {
+                "p_id": result.user.id,
+                "p_profile": profile_data,
+                "p_role": role_data
+            }).execute()
         
         return {"message": "Verification email sent. Please check your inbox to verify your email."}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/profiles")
-def get_profiles(user_type: Optional[str] = None, limit: int = 50, offset: int = 0):
-    supabase = get_Supabase()
-    
+async def get_profiles(user_type: Optional[str] = None, limit: int = 50, offset: int = 0, supabase: AsyncClient = Depends(get_supabase)):
     try:
         query = supabase.table('profiles').select('*').eq('is_active', True)
         
         if user_type:
             query = query.eq('user_type', user_type)
             
-        result = query.range(offset, offset + limit - 1).execute()
+        result = await query.range(offset, offset + limit - 1).execute()
         return {"profiles": result.data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/profiles/{profile_id}")
-def get_profile(profile_id: str):
-    supabase = get_Supabase()
-    
+async def get_profile(profile_id: str, supabase: AsyncClient = Depends(get_supabase)):
     try:
         # Get basic profile
-        profile = supabase.table('profiles').select('*').eq('id', profile_id).single().execute()
+        profile = await supabase.table('profiles').select('*').eq('id', profile_id).single().execute()
         
         if not profile.data:
             raise HTTPException(status_code=404, detail="Profile not found")
@@ -179,16 +174,16 @@ def get_profile(profile_id: str):
         specific_data = {}
         
         if user_type == "patient":
-            patient = supabase.table('patients').select('*').eq('id', profile_id).single().execute()
+            patient = await supabase.table('patients').select('*').eq('id', profile_id).single().execute()
             specific_data = patient.data or {}
         elif user_type == "donor":
-            donor = supabase.table('donors').select('*').eq('id', profile_id).single().execute()
+            donor = await supabase.table('donors').select('*').eq('id', profile_id).single().execute()
             specific_data = donor.data or {}
         elif user_type == "doctor":
-            doctor = supabase.table('doctors').select('*').eq('id', profile_id).single().execute()
+            doctor = await supabase.table('doctors').select('*').eq('id', profile_id).single().execute()
             specific_data = doctor.data or {}
         elif user_type == "hospital":
-            hospital = supabase.table('hospitals').select('*').eq('id', profile_id).single().execute()
+            hospital = await supabase.table('hospitals').select('*').eq('id', profile_id).single().execute()
             specific_data = hospital.data or {}
             
         return {
@@ -199,82 +194,86 @@ def get_profile(profile_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/profiles/{profile_id}")
-def update_profile(profile_id: str, request: ProfileUpdateRequest):
-    supabase = get_Supabase()
-    
+async def update_profile(profile_id: str, request: ProfileUpdateRequest, supabase: AsyncClient = Depends(get_supabase)):
     try:
         # Update basic profile
         update_data = {k: v for k, v in request.dict().items() if v is not None}
         if update_data:
-            supabase.table('profiles').update(update_data).eq('id', profile_id).execute()
+            await supabase.table('profiles').update(update_data).eq('id', profile_id).execute()
             
         return {"message": "Profile updated successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Role table and column for each search filter; a filter only constrains
+# profiles whose user type has that column, other types pass through
+SEARCH_FILTER_COLUMNS = {
+    "blood_type": {"patient": "patients", "donor": "donors"},
+    "thalassemia_specialist": {"doctor": "doctors", "hospital": "hospitals"},
+    "available": {"donor": "donors", "doctor": "doctors"},
+}
+
+def _postgrest_value(value):
+    return str(value).lower() if isinstance(value, bool) else value
+
 @app.post("/search")
-def search_profiles(request: SearchRequest):
-    supabase = get_Supabase()
-    
+async def search_profiles(request: SearchRequest, supabase: AsyncClient = Depends(get_supabase)):
     try:
-        # Start with profiles table
-        query = supabase.table('profiles').select('*').eq('is_active', True)
-        
+        # Role-table conditions become filters on embedded resources, so the
+        # whole search is a single PostgREST request
+        role_filters = {}  # user_type -> (table, [(column, value)])
+        for column, tables in SEARCH_FILTER_COLUMNS.items():
+            value = getattr(request, column)
+            if value is None:
+                continue
+            for user_type, table in tables.items():
+                if request.user_type and user_type != request.user_type:
+                    continue
+                role_filters.setdefault(user_type, (table, []))[1].append((column, value))
+
+        embeds = []
+        for user_type, (table, conditions) in role_filters.items():
+            columns = ",".join(sorted({column for column, _ in conditions}))
+            # With a single user type, an inner join drops non-matching profiles
+            embeds.append(f"{table}{'!inner' if request.user_type else ''}({columns})")
+        query = supabase.table('profiles').select(",".join(["*"] + embeds)).eq('is_active', True)
+
         if request.user_type:
             query = query.eq('user_type', request.user_type)
         if request.city:
             query = query.ilike('city', f'%{request.city}%')
         if request.state:
             query = query.ilike('state', f'%{request.state}%')
-            
-        profiles = query.execute()
-        
-        # Filter by specific criteria
-        filtered_profiles = []
-        for profile in profiles.data:
-            include_profile = True
-            
-            # Check blood type for patients and donors
-            if request.blood_type and profile['user_type'] in ['patient', 'donor']:
-                specific_table = 'patients' if profile['user_type'] == 'patient' else 'donors'
-                specific_data = supabase.table(specific_table).select('blood_type').eq('id', profile['id']).single().execute()
-                if specific_data.data and specific_data.data['blood_type'] != request.blood_type:
-                    include_profile = False
-                    
-            # Check thalassemia specialist for doctors and hospitals
-            if request.thalassemia_specialist is not None and profile['user_type'] in ['doctor', 'hospital']:
-                specific_table = 'doctors' if profile['user_type'] == 'doctor' else 'hospitals'
-                specific_data = supabase.table(specific_table).select('thalassemia_specialist').eq('id', profile['id']).single().execute()
-                if specific_data.data and specific_data.data['thalassemia_specialist'] != request.thalassemia_specialist:
-                    include_profile = False
-                    
-            # Check availability for donors and doctors
-            if request.available is not None and profile['user_type'] in ['donor', 'doctor']:
-                specific_table = 'donors' if profile['user_type'] == 'donor' else 'doctors'
-                specific_data = supabase.table(specific_table).select('available').eq('id', profile['id']).single().execute()
-                if specific_data.data and specific_data.data['available'] != request.available:
-                    include_profile = False
-                    
-            if include_profile:
-                filtered_profiles.append(profile)
-                
-        return {"profiles": filtered_profiles}
+        for table, conditions in role_filters.values():
+            for column, value in conditions:
+                query = query.eq(f"{table}.{column}", _postgrest_value(value))
+        if role_filters and not request.user_type:
+            # Keep a profile if its type is unfiltered or its role row matched
+            unfiltered = f"user_type.not.in.({','.join(role_filters)})"
+            matched = [f"{table}.not.is.null" for table, _ in role_filters.values()]
+            query = query.or_(",".join([unfiltered] + matched))
+
+        result = await query.order('id').range(request.offset, request.offset + request.limit - 1).execute()
+        embedded_tables = {table for table, _ in role_filters.values()}
+        profiles = [
+            {key: value for key, value in profile.items() if key not in embedded_tables}
+            for profile in result.data
+        ]
+        return {"profiles": profiles}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/stats")
-def get_stats():
-    supabase = get_Supabase()
-    
+async def get_stats(supabase: AsyncClient = Depends(get_supabase)):
     try:
-        # Get counts for each user type
-        stats = {}
+        # Count each user type concurrently
         user_types = ['patient', 'donor', 'doctor', 'hospital']
-        
-        for user_type in user_types:
-            count = supabase.table('profiles').select('id', count='exact').eq('user_type', user_type).eq('is_active', True).execute()
-            stats[f"{user_type}_count"] = count.count or 0
-            
+        counts = await asyncio.gather(*(
+            supabase.table('profiles').select('id', count='exact', head=True).eq('user_type', user_type).eq('is_active', True).execute()
+            for user_type in user_types
+        ))
+        stats = {f"{user_type}_count": count.count or 0 for user_type, count in zip(user_types, counts)}
+
         return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
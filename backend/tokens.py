@@ -0,0 +1,131 @@
+"""
+Stateless signed session tokens.
+
+Login issues an HS256 JWT carrying `sub` (user id), `user_type`, `jti`, `iat`
+and `exp`. Routes verify it in-process: an HMAC check plus a bounded cache of
+already-decoded tokens, so authorization costs no database round trip.
+Revocation (logout) is recorded in the `revoked_tokens` table and only
+consulted on sensitive writes.
+
+Every process that verifies tokens must share SESSION_SECRET. Without it a
+random per-process secret is used, which only suits single-process development.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+import uuid
+import warnings
+from collections import OrderedDict
+from typing import NamedTuple
+
+import orjson
+
+SESSION_SECRET = os.getenv("SESSION_SECRET")
+if not SESSION_SECRET:
+    warnings.warn("SESSION_SECRET is not set; session tokens will not survive a restart or work across workers")
+    SESSION_SECRET = secrets.token_urlsafe(32)
+SESSION_TOKEN_TTL = int(os.getenv("SESSION_TOKEN_TTL", "900"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+_KEY = SESSION_SECRET.encode()
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+# Fixed header: tokens with any other header (e.g. alg "none") fail verification
+_HEADER = _b64encode(orjson.dumps({"alg": "HS256", "typ": "JWT"}))
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class TokenClaims(NamedTuple):
+    user_id: str
+    user_type: str
+    token_id: str
+    expires_at: int
+
+
+def _sign(signing_input: bytes) -> bytes:
+    return _b64encode(hmac.new(_KEY, signing_input, hashlib.sha256).digest())
+
+
+def issue_token(user_id: str, user_type: str, ttl: int = None) -> tuple:
+    """Returns (token, expires_in seconds)."""
+    ttl = SESSION_TOKEN_TTL if ttl is None else ttl
+    now = int(time.time())
+    payload = _b64encode(orjson.dumps({
+        "sub": str(user_id),
+        "user_type": user_type,
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": now + ttl,
+    }))
+    signing_input = _HEADER + b"." + payload
+    return (signing_input + b"." + _sign(signing_input)).decode(), ttl
+
+
+class _TokenCache:
+    """LRU of token -> claims; entries are dropped once the token expires."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str, now: float):
+        with self._lock:
+            claims = self._entries.get(token)
+            if claims is None:
+                return None
+            if claims.expires_at <= now:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims
+
+    def put(self, token: str, claims: TokenClaims):
+        with self._lock:
+            self._entries[token] = claims
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_cache = _TokenCache(TOKEN_CACHE_SIZE)
+
+
+def verify_token(token: str) -> TokenClaims:
+    """Claims for a valid, unexpired token; raises InvalidToken otherwise."""
+    now = time.time()
+    claims = _cache.get(token, now)
+    if claims is not None:
+        return claims
+
+    try:
+        header, payload, signature = token.encode().split(b".")
+    except ValueError:
+        raise InvalidToken("Malformed token")
+    if header != _HEADER or not hmac.compare_digest(signature, _sign(header + b"." + payload)):
+        raise InvalidToken("Invalid token signature")
+    try:
+        data = orjson.loads(_b64decode(payload))
+        claims = TokenClaims(data["sub"], data["user_type"], data["jti"], int(data["exp"]))
+    except (ValueError, KeyError, TypeError):
+        raise InvalidToken("Malformed token")
+    if claims.expires_at <= now:
+        raise InvalidToken("Token has expired")
+
+    _cache.put(token, claims)
+    return claims
@@ -1,16 +1,16 @@
 from dotenv import load_dotenv
 import os
-from supabase import create_client, Client
+from typing import Optional
+import httpx
+from supabase import create_client, Client, ClientOptions, acreate_client, AsyncClient, AsyncClientOptions
+from supabase_auth import AsyncGoTrueClient
 
 load_dotenv()
 
-def get_Supabase() -> Client:
-    """Create a Supabase client for backend usage.
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "30"))
 
-    Prefer the service role key to perform server-side operations that interact with
-    RLS-protected tables (e.g., inserting into `profiles`, `patients`, etc.).
-    Falls back to anon key if service key is not provided.
-    """
+def _credentials():
     url: str = os.environ.get("VITE_SUPABASE_URL")
     service_key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
     anon_key: str = os.environ.get("VITE_SUPABASE_ANON_KEY")
@@ -21,9 +21,64 @@ def get_Supabase() -> Client:
     key_to_use = service_key or anon_key
     if not key_to_use:
         raise RuntimeError("Missing SUPABASE_SERVICE_ROLE_KEY or SUPABASE_ANON_KEY environment variable")
+    return url, key_to_use
+
+def create_http_client() -> httpx.AsyncClient:
+    """Pooled HTTP/2 transport shared by every Supabase client in the process.
+
+    Keeps connections (and their TLS sessions) alive across requests instead
+    of handshaking again for each new client.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=SUPABASE_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=SUPABASE_MAX_CONNECTIONS,
+        ),
+    )
+
+def get_Supabase() -> Client:
+    """Create a Supabase client for backend usage.
 
-    supabase: Client = create_client(url, key_to_use)
+    Prefer the service role key to perform server-side operations that interact with
+    RLS-protected tables (e.g., inserting into `profiles`, `patients`, etc.).
+    Falls back to anon key if service key is not provided.
+    """
+    url, key_to_use = _credentials()
+    supabase: Client = create_client(url, key_to_use, ClientOptions(auto_refresh_token=False, persist_session=False))
     return supabase
 
+async def get_async_Supabase(http_client: Optional[httpx.AsyncClient] = None) -> AsyncClient:
+    """Async counterpart of `get_Supabase`, used by src/register.py.
+
+    Pass `http_client` (see `create_http_client`) to reuse a pooled transport;
+    without it the client opens its own connections.
+    """
+    url, key_to_use = _credentials()
+    options = AsyncClientOptions(
+        httpx_client=http_client,
+        auto_refresh_token=False,
+        persist_session=False,
+    )
+    return await acreate_client(url, key_to_use, options)
+
+def get_auth_client(http_client: Optional[httpx.AsyncClient] = None) -> AsyncGoTrueClient:
+    """Short-lived auth client for sign-in/sign-up calls.
+
+    Signing in on a Client switches its Authorization header to the user's
+    token, so a process-wide client must never be used for auth. This client
+    holds no session beyond the request and is cheap to build on a shared
+    `http_client`.
+    """
+    url, key_to_use = _credentials()
+    return AsyncGoTrueClient(
+        url=f"{url}/auth/v1",
+        headers={"apiKey": key_to_use, "Authorization": f"Bearer {key_to_use}"},
+        auto_refresh_token=False,
+        persist_session=False,
+        http_client=http_client,
+    )
+
 if __name__ == "__main__":
     get_Supabase()
@@ -0,0 +1,95 @@
+"""
+Startup warm-up, so the first requests after a deploy don't pay for it.
+
+`load_shared_data` configures the SQLAlchemy mappers, loads the inventory
+snapshot and, when RANKER_MODEL_DIR is set, the ranker artifacts. It is
+idempotent: gunicorn runs it in the master before forking (the results are
+then shared copy-on-write) and each worker's lifespan runs it again, finding
+everything already loaded.
+
+`run` adds the per-process parts: opening WARMUP_CONNECTIONS pool connections
+on the primary and each replica, and one representative discovery query so
+its statement is compiled and cached. Failures are logged, not raised; a
+cold cache is better than a worker that refuses to start.
+"""
+import logging
+import os
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+
+import crud
+from database import SessionLocal, engine, replicas
+from inventory_snapshot import inventory_snapshot
+
+logger = logging.getLogger(__name__)
+
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "2"))
+RANKER_MODEL_DIR = os.getenv("RANKER_MODEL_DIR")
+
+
+def _timed(timings: dict, name: str, fn):
+    start = time.perf_counter()
+    try:
+        fn()
+        timings[name] = round((time.perf_counter() - start) * 1e3, 1)
+    except Exception as e:
+        logger.warning("Warm-up step %s failed: %s", name, e)
+        timings[name] = None
+
+
+def _load_inventory():
+    db = SessionLocal()
+    try:
+        inventory_snapshot.columns(db)
+    finally:
+        db.close()
+
+
+def _load_ranker():
+    import ranker_features  # numpy feature code; only needed once a model is configured
+
+    ranker_features.load_artifacts(RANKER_MODEL_DIR)
+
+
+def open_connections(target_engine, count: int):
+    """Check out `count` connections at once so the pool keeps them open."""
+    connections = []
+    try:
+        for _ in range(min(count, target_engine.pool.size())):
+            connection = target_engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def _warm_query():
+    db = SessionLocal()
+    try:
+        crud.search_donors(db, blood_type="O+", available=True, limit=1)
+    finally:
+        db.close()
+
+
+def load_shared_data() -> dict:
+    """Process-wide data worth sharing across forked workers; returns step timings in ms."""
+    timings = {}
+    _timed(timings, "mappers", configure_mappers)
+    _timed(timings, "inventory_snapshot", _load_inventory)
+    if RANKER_MODEL_DIR:
+        _timed(timings, "ranker_artifacts", _load_ranker)
+    return timings
+
+
+def run() -> dict:
+    """Full per-worker warm-up; returns step timings in ms (None for a failed step)."""
+    timings = load_shared_data()
+    _timed(timings, "primary_connections", lambda: open_connections(engine, WARMUP_CONNECTIONS))
+    for index, replica_engine in enumerate(replicas.engines):
+        _timed(timings, f"replica{index}_connections", lambda: open_connections(replica_engine, WARMUP_CONNECTIONS))
+    _timed(timings, "warm_query", _warm_query)
+    logger.info("Warm-up finished: %s", timings)
+    return timings
@@ -1,53 +1,139 @@
-import random
+"""
+Augment blood bank rows with the set of blood groups each bank carries.
+
+Groups are encoded as an 8-bit mask (`Blood_Group_Mask`, bit i = BLOOD_TYPES[i])
+so "banks carrying group X" is a bitwise test over an array. The pipe-joined
+`Blood_Group` column (e.g. `A+|A-|AB+`) is still written for older consumers.
+The CSV is processed in chunks and every step is vectorized.
+
+Modes:
+    augment  assign a random multi-group set to each bank (the original behaviour)
+    encode   keep the existing Blood_Group column and add the mask
+
+Examples:
+    python augment_data_types.py augment
+    python augment_data_types.py encode --input synthetic_blood_banks_1100_augmented.csv \
+        --output synthetic_blood_banks_1100_augmented.csv
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 
-INPUT = r"e:\non github files\Techolution Interview\synthetic_blood_banks_1100.csv"
-OUTPUT = r"e:\non github files\Techolution Interview\synthetic_blood_banks_1100_augmented.csv"
-
-random.seed(42)
-
-blood_types = ["A+","A-","B+","B-","AB+","AB-","O+","O-"]
-
-df = pd.read_csv(INPUT, dtype=str)
-
-# Ensure column exists
-if "Blood_Group" not in df.columns:
-    raise SystemExit("Blood_Group column not found")
-
-all_prob = 0.06   # ~6% of rows will get ALL types
-min_types = 2     # ensure multiple types per bank
-
-new_groups = []
-for _ in range(len(df)):
-    if random.random() < all_prob:
-        types = blood_types[:]  # all types
-    else:
-        k = random.randint(min_types, len(blood_types))
-        types = random.sample(blood_types, k)
-    new_groups.append("|".join(sorted(types)))  # sorted for consistency
-
-df["Blood_Group"] = new_groups
-
-# Guarantee that every blood type appears at least once in dataset
-present = set()
-for cell in df["Blood_Group"]:
-    present.update(cell.split("|"))
-missing = [t for t in blood_types if t not in present]
-if missing:
-    # add missing types to random rows (append if not already present)
-    rows = list(df.index)
-    random.shuffle(rows)
-    i = 0
-    for m in missing:
-        while i < len(rows):
-            idx = rows[i]
-            current = set(df.at[idx, "Blood_Group"].split("|"))
-            if m not in current:
-                current.add(m)
-                df.at[idx, "Blood_Group"] = "|".join(sorted(current))
-                i += 1
-                break
-            i += 1
-
-df.to_csv(OUTPUT, index=False)
-print(f"Written augmented CSV to: {OUTPUT}")
\ No newline at end of file
+HERE = Path(__file__).resolve().parent
+INPUT = HERE / "synthetic_blood_banks_1100.csv"
+OUTPUT = HERE / "synthetic_blood_banks_1100_augmented.csv"
+
+# Bit order is part of the data format; append new values, never reorder
+BLOOD_TYPES = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"]
+BLOOD_TYPE_BITS = {t: 1 << i for i, t in enumerate(BLOOD_TYPES)}
+ALL_TYPES_MASK = (1 << len(BLOOD_TYPES)) - 1
+
+ALL_PROB = 0.06  # ~6% of rows will get ALL types
+MIN_TYPES = 2    # ensure multiple types per bank
+
+# mask -> "A+|A-|AB+" (sorted, matching the historical format)
+MASK_TO_GROUPS = np.array(
+    ["|".join(sorted(t for t in BLOOD_TYPES if mask & BLOOD_TYPE_BITS[t])) for mask in range(ALL_TYPES_MASK + 1)],
+    dtype=object,
+)
+
+
+def encode_groups(groups: pd.Series) -> np.ndarray:
+    """Pipe-joined group strings -> uint8 masks; each distinct string is parsed once."""
+    codes, uniques = pd.factorize(groups.fillna(""))
+    unique_masks = np.array(
+        [sum(BLOOD_TYPE_BITS[t] for t in value.split("|") if t in BLOOD_TYPE_BITS) for value in uniques],
+        dtype=np.uint8,
+    )
+    return unique_masks[codes]
+
+
+def decode_masks(masks: np.ndarray) -> np.ndarray:
+    return MASK_TO_GROUPS[masks]
+
+
+def banks_with_group(masks: np.ndarray, blood_type: str) -> np.ndarray:
+    """Boolean array: which banks carry `blood_type`."""
+    return (masks & BLOOD_TYPE_BITS[blood_type]) != 0
+
+
+def random_masks(rng: np.random.Generator, n: int) -> np.ndarray:
+    """Each row gets either every type or a random subset of MIN_TYPES..8 types."""
+    k = rng.integers(MIN_TYPES, len(BLOOD_TYPES) + 1, size=n)
+    k[rng.random(n) < ALL_PROB] = len(BLOOD_TYPES)
+    # Rank of each type in a random per-row permutation; keep the k lowest
+    ranks = rng.random((n, len(BLOOD_TYPES))).argsort(axis=1).argsort(axis=1)
+    bits = 1 << np.arange(len(BLOOD_TYPES))
+    return ((ranks < k[:, None]) * bits).sum(axis=1).astype(np.uint8)
+
+
+def fill_missing_types(rng: np.random.Generator, masks: np.ndarray, seen: int) -> np.ndarray:
+    """Guarantee every blood type appears at least once in the dataset."""
+    missing = ALL_TYPES_MASK & ~(seen | int(np.bitwise_or.reduce(masks, initial=0)))
+    if missing and len(masks):
+        masks = masks.copy()
+        for bit in (b for b in BLOOD_TYPE_BITS.values() if missing & b):
+            masks[rng.integers(len(masks))] |= bit
+    return masks
+
+
+def process(input_path: Path, output_path: Path, mode: str, chunksize: int, seed: int):
+    rng = np.random.default_rng(seed)
+    # Read fully into chunks first when rewriting a file in place
+    reader = pd.read_csv(input_path, dtype=str, chunksize=chunksize)
+    if input_path.resolve() == output_path.resolve():
+        reader = iter(list(reader))
+
+    seen = 0
+    counts = np.zeros(len(BLOOD_TYPES), dtype=np.int64)
+    rows = 0
+    pending = None
+    header = True
+
+    def write(chunk, masks, last):
+        nonlocal seen, header, rows
+        if last and mode == "augment":
+            masks = fill_missing_types(rng, masks, seen)
+        seen |= int(np.bitwise_or.reduce(masks, initial=0))
+        for i, t in enumerate(BLOOD_TYPES):
+            counts[i] += banks_with_group(masks, t).sum()
+        chunk["Blood_Group"] = decode_masks(masks)
+        chunk["Blood_Group_Mask"] = masks
+        chunk.to_csv(output_path, mode="w" if header else "a", header=header, index=False)
+        header = False
+        rows += len(chunk)
+
+    for chunk in reader:
+        if "Blood_Group" not in chunk.columns:
+            raise SystemExit("Blood_Group column not found")
+        if mode == "augment":
+            masks = random_masks(rng, len(chunk))
+        else:
+            masks = encode_groups(chunk["Blood_Group"])
+        # Hold one chunk back so the missing-type fix-up can touch the last one
+        if pending is not None:
+            write(*pending, last=False)
+        pending = (chunk, masks)
+    if pending is not None:
+        write(*pending, last=True)
+
+    print(f"Written {rows} rows to: {output_path}")
+    for t, count in zip(BLOOD_TYPES, counts):
+        print(f"  {t:<4}{count:>8} banks")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["augment", "encode"])
+    parser.add_argument("--input", type=Path, default=INPUT)
+    parser.add_argument("--output", type=Path, default=OUTPUT)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    process(args.input, args.output, args.mode, args.chunksize, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+#!/bin/sh
+# Runs once when the postgres volume is first initialised: lets the
+# postgres-replica service (docker-compose.yml) stream WAL from this server.
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
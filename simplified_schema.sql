@@ -162,6 +162,30 @@ CREATE TABLE messages (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- =====================================================
+-- 10. BLOOD BANKS TABLE (inventory loaded by backend/load_inventory.py)
+-- =====================================================
+CREATE TABLE blood_banks (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    license_number TEXT,
+    license_valid_till DATE,
+    state TEXT,
+    city TEXT,
+    latitude DOUBLE PRECISION NOT NULL,
+    longitude DOUBLE PRECISION NOT NULL,
+    hospital_type TEXT,
+    blood_group_mask SMALLINT NOT NULL DEFAULT 0, -- bit i: A+, A-, B+, B-, AB+, AB-, O+, O-
+    units_available INTEGER NOT NULL DEFAULT 0,
+    freshness_days INTEGER,
+    emergency_support BOOLEAN DEFAULT false,
+    rating DOUBLE PRECISION,
+    avg_response_time_min INTEGER,
+    is_govt BOOLEAN DEFAULT false,
+    contact TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 -- =====================================================
 -- INDEXES FOR PERFORMANCE
 -- =====================================================
@@ -180,6 +204,8 @@ CREATE INDEX idx_patients_severity ON patients(severity_level);
 CREATE INDEX idx_donors_blood_type ON donors(blood_type);
 CREATE INDEX idx_donors_available ON donors(available);
 CREATE INDEX idx_donors_last_donation ON donors(last_donation_date);
+-- "Who can donate today" for a blood group: one range scan over available donors
+CREATE INDEX idx_donors_eligible ON donors(blood_type, COALESCE(last_donation_date, '-infinity'::date)) WHERE available;
 
 -- Doctors indexes
 CREATE INDEX idx_doctors_specialization ON doctors(specialization);
@@ -191,6 +217,11 @@ CREATE INDEX idx_hospitals_thalassemia_specialist ON hospitals(thalassemia_speci
 CREATE INDEX idx_hospitals_rating ON hospitals(rating);
 CREATE INDEX idx_hospitals_services ON hospitals USING GIN(services);
 
+-- Blood banks: bounding-box prefilter for radius search
+CREATE INDEX idx_blood_banks_lat_lon ON blood_banks(latitude, longitude);
+-- Incremental inventory snapshot refreshes (rows changed since a watermark)
+CREATE INDEX idx_blood_banks_updated_at ON blood_banks(updated_at);
+
 -- Blood requests indexes
 CREATE INDEX idx_blood_requests_status ON blood_requests(status);
 CREATE INDEX idx_blood_requests_urgency ON blood_requests(urgency_level);
@@ -249,6 +280,41 @@ CREATE TRIGGER trigger_update_donor_donations
     AFTER INSERT ON blood_donations 
     FOR EACH ROW EXECUTE FUNCTION update_donor_total_donations();
 
+-- Signup: profile and role rows in one transaction (called via RPC from src/register.py)
+CREATE OR REPLACE FUNCTION create_user_profile(p_id UUID, p_profile JSONB, p_role JSONB DEFAULT '{}'::jsonb)
+RETURNS VOID AS $$
+DECLARE
+    v_user_type TEXT := p_profile->>'user_type';
+BEGIN
+    INSERT INTO profiles (id, user_type, first_name, last_name, email, phone, address, city, state)
+    VALUES (
+        p_id, v_user_type, COALESCE(p_profile->>'first_name', ''), COALESCE(p_profile->>'last_name', ''),
+        p_profile->>'email', p_profile->>'phone', p_profile->>'address', p_profile->>'city', p_profile->>'state'
+    );
+
+    IF v_user_type = 'patient' THEN
+        INSERT INTO patients (id, blood_type, thalassemia_type, severity_level)
+        VALUES (p_id, p_role->>'blood_type', p_role->>'thalassemia_type', p_role->>'severity_level');
+    ELSIF v_user_type = 'donor' THEN
+        INSERT INTO donors (id, blood_type, last_donation_date, contact_preference)
+        VALUES (p_id, p_role->>'blood_type', (p_role->>'last_donation_date')::date, COALESCE(p_role->>'contact_preference', 'email'));
+    ELSIF v_user_type = 'hospital' THEN
+        INSERT INTO hospitals (id, hospital_name, services, thalassemia_specialist)
+        VALUES (
+            p_id, p_role->>'hospital_name',
+            ARRAY(SELECT jsonb_array_elements_text(COALESCE(p_role->'services', '[]'::jsonb))),
+            COALESCE((p_role->>'thalassemia_specialist')::boolean, false)
+        );
+    ELSIF v_user_type = 'doctor' THEN
+        INSERT INTO doctors (id, specialization, thalassemia_specialist)
+        VALUES (p_id, 'General Medicine', false);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the backend (service role) may create profiles this way
+REVOKE EXECUTE ON FUNCTION create_user_profile(UUID, JSONB, JSONB) FROM PUBLIC, anon, authenticated;
+
 -- =====================================================
 -- ROW LEVEL SECURITY (RLS) POLICIES
 -- =====================================================